@@ -2,33 +2,15 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 import typer
 
-# --- internal imports (implement these in your MVP) --------------------------
-# Scaffold (wizards or flag-based) – keep them small & idempotent
-from transmutedb.scaffold.generate import (
-    init_project,
-    make_entity_wizard,
-    make_activity_wizard,
-)
-
-# Config loader & validators
-from transmutedb.config.loader import (
-    load_pipeline_config,
-    resolve_overrides,
-    print_config,
-)
-from transmutedb.config.models import PipelineConfig  # pydantic models
-
-# Pipeline runner
-from transmutedb.flow.runner import run_pipeline  # executes activities in order
-
-# DQ & logs helpers (thin wrappers over DuckDB)
-from transmutedb.flow.dq import lint_dq  # validates DQ sections only (syntax/refs)
-from transmutedb.ctl.schema import ensure_ctl_tables
-from transmutedb.engine.duckdb import connect as duck_connect, fetch_df
+# --- internal imports --------------------------------------------------------
+# Heavy modules (duckdb, polars, pydantic) are imported inside the commands that
+# need them, so `transmutedb --help` and light commands only pay for typer.
+if TYPE_CHECKING:
+    from transmutedb.config.models import PipelineConfig  # pydantic models
 
 # ---------------------------------------------------------------------------
 
@@ -47,19 +29,27 @@ app.add_typer(schedule_app, name="schedule")
 
 
 # --------------------------- utils -----------------------------------------
+_BOOL_MAP = {"true": True, "false": False}
+
+# DuckDB startup settings for pipeline runs
+_RUN_DUCKDB_CONFIG = {"preserve_insertion_order": False}
+
+
 def _parse_kv(pairs: List[str]) -> dict:
     """Parse CLI --set key=val pairs into a dict with simple casting."""
     out: dict = {}
     for item in pairs:
-        if "=" not in item:
+        # partition finds the separator and splits in one pass
+        k, sep, v = item.partition("=")
+        if not sep:
             raise typer.BadParameter(
                 f"Invalid --set value '{item}', expected key=value."
             )
-        k, v = item.split("=", 1)
         v_strip = v.strip()
-        if v_strip.lower() in ("true", "false"):
-            out[k] = v_strip.lower() == "true"
+        if v_strip.lower() in _BOOL_MAP:
+            out[k] = _BOOL_MAP[v_strip.lower()]
         else:
+            # int() and float() also accept forms such as 1_000, nan and inf
             try:
                 out[k] = int(v_strip)
             except ValueError:
@@ -80,6 +70,8 @@ def init(
         False, "--force", help="Overwrite existing files if present."
     ),
 ):
+    from transmutedb.scaffold.generate import init_project
+
     init_project(path, force=force)
     typer.echo(f"✅ project initialized at {path.resolve()}")
 
@@ -94,6 +86,8 @@ def make_entity(
         False, "--defaults", help="Accept sensible defaults without prompts."
     ),
 ):
+    from transmutedb.scaffold.generate import make_entity_wizard
+
     make_entity_wizard(pipeline, use_defaults=defaults)
     typer.echo(f"✅ entity added to pipeline '{pipeline}'")
 
@@ -105,6 +99,8 @@ def make_activity(
     pipeline: str = typer.Argument(...),
     # You can add --kind/--scope flags later; wizard first for DX.
 ):
+    from transmutedb.scaffold.generate import make_activity_wizard
+
     make_activity_wizard(pipeline)
     typer.echo(f"✅ activity added to pipeline '{pipeline}'")
 
@@ -115,6 +111,8 @@ def config_show(
     pipeline: str = typer.Argument(...),
     project_dir: Path = typer.Option(Path("."), "--project-dir", help="Project root."),
 ):
+    from transmutedb.config.loader import load_pipeline_config, print_config
+
     cfg: PipelineConfig = load_pipeline_config(
         project_dir / "pipelines" / pipeline / "pipeline.toml"
     )
@@ -127,6 +125,8 @@ def config_lint(
     pipeline: str = typer.Argument(...),
     project_dir: Path = typer.Option(Path("."), "--project-dir"),
 ):
+    from transmutedb.config.loader import load_pipeline_config
+
     try:
         _ = load_pipeline_config(project_dir / "pipelines" / pipeline / "pipeline.toml")
         typer.echo("✅ config is valid")
@@ -152,15 +152,22 @@ def run(
         None, "--warehouse", help="duckdb://file:dw.duckdb"
     ),
 ):
+    from transmutedb.config.loader import load_pipeline_config, resolve_overrides
+    from transmutedb.ctl.schema import ensure_ctl_tables
+    from transmutedb.engine.duckdb import connect as duck_connect
+    from transmutedb.flow.runner import run_pipeline  # executes activities in order
+
     cfg = load_pipeline_config(project_dir / "pipelines" / pipeline / "pipeline.toml")
     overrides = _parse_kv(set)
     cfg = resolve_overrides(
         cfg, overrides=overrides, env=env
     )  # no-op for MVP if you like
 
-    # open duckdb, ensure ctl tables exist (logs/dq)
+    # open duckdb, ensure ctl tables exist (logs/dq). The run owns this
+    # connection, so CTAS and INSERT may write in parallel without keeping
+    # source row order; pipeline reads that need an order use ORDER BY.
     uri = warehouse_uri or "duckdb://file:dw.duckdb"
-    con = duck_connect(uri)
+    con = duck_connect(uri, config=_RUN_DUCKDB_CONFIG)
     ensure_ctl_tables(con)
 
     # execute flow
@@ -176,6 +183,9 @@ def dq_lint_cmd(
     pipeline: str = typer.Argument(...),
     project_dir: Path = typer.Option(Path("."), "--project-dir"),
 ):
+    from transmutedb.config.loader import load_pipeline_config
+    from transmutedb.flow.dq import lint_dq  # validates DQ sections only (syntax/refs)
+
     cfg = load_pipeline_config(project_dir / "pipelines" / pipeline / "pipeline.toml")
     errors = lint_dq(cfg)
     if errors:
@@ -187,38 +197,73 @@ def dq_lint_cmd(
 
 
 # --------------------------- LOGS ------------------------------------------
+_LOG_BATCH_SIZE = 1024
+_LOG_LINE = "[{}] {}.{} {} - {} ri={} ro={} {}".format
+
+
 @logs_app.command("tail", help="Tail recent run logs from run_log table (DuckDB).")
 def logs_tail(
     pipeline: Optional[str] = typer.Option(None, "--pipeline"),
     limit: int = typer.Option(50, "--limit"),
     warehouse_uri: str = typer.Option("duckdb://file:dw.duckdb", "--warehouse"),
 ):
-    con = duck_connect(warehouse_uri)
-    ensure_ctl_tables(con)
-    where = "WHERE 1=1"
-    if pipeline:
-        where += f" AND pipeline = '{pipeline}'"
-    df = fetch_df(
-        con,
-        f"""
+    import duckdb
+
+    from transmutedb.engine.duckdb import connect as duck_connect
+    from transmutedb.engine.duckdb import parse_uri
+
+    # A warehouse that hasn't been created yet has no logs; checking first
+    # keeps the read-only open below from reporting it as an error
+    db_path = parse_uri(warehouse_uri)
+    if not Path(db_path).exists():
+        typer.echo("ℹ️  no run logs found.")
+        raise typer.Exit(0)
+
+    # Read-only: never creates the file or runs DDL. DuckDB refuses it while
+    # another process, such as a running pipeline, has the file open for writing.
+    try:
+        con = duck_connect(warehouse_uri, read_only=True)
+    except duckdb.IOException as err:
+        typer.echo(f"❌ warehouse {db_path} is locked or unreadable: {err}")
+        raise typer.Exit(code=1) from err
+    if not con.execute(
+        "SELECT 1 FROM duckdb_tables() WHERE table_name = 'run_log'"
+    ).fetchone():
+        typer.echo("ℹ️  no run logs found.")
+        raise typer.Exit(0)
+    cursor = con.execute(
+        """
         SELECT started_at, pipeline, step, entity, status, rows_in, rows_out, error_message
         FROM run_log
-        {where}
+        WHERE (? IS NULL OR pipeline = ?)
         ORDER BY started_at DESC
-        LIMIT {limit}
+        LIMIT ?
         """,
+        [pipeline, pipeline, limit],
     )
-    # Simple print (you can pretty-print with tabulate later)
-    for row in df.iter_rows(named=True):
-        typer.echo(
-            f"[{row['started_at']}] {row['pipeline']}.{row['step']} "
-            f"{'(' + row['entity'] + ')' if row['entity'] else ''} "
-            f"- {row['status']} ri={row['rows_in']} ro={row['rows_out']} "
-            f"{'err=' + (row['error_message'] or '') if row['error_message'] else ''}"
-        )
+    # Stream rows in chunks so large --limit values stay bounded in memory
+    while rows := cursor.fetchmany(_LOG_BATCH_SIZE):
+        for started_at, pipe, step, entity, status, rows_in, rows_out, error in rows:
+            typer.echo(
+                _LOG_LINE(
+                    started_at,
+                    pipe,
+                    step,
+                    f"({entity})" if entity else "",
+                    status,
+                    rows_in,
+                    rows_out,
+                    f"err={error}" if error else "",
+                )
+            )
 
 
 # --------------------------- SCHEDULE --------------------------------------
+_CRON_LINE = (
+    "{cron} cd {cwd} && transmutedb run {pipeline} --env {env} --step {step} >> {log} 2>&1"
+).format
+
+
 @schedule_app.command(
     "add", help="Add/append a cron-like schedule to schedules.toml in project root."
 )
@@ -234,7 +279,8 @@ def schedule_add(
     sched_path = project_dir / "schedules.toml"
     data = {}
     if sched_path.exists():
-        data = tomllib.loads(sched_path.read_text())
+        with sched_path.open("rb") as f:
+            data = tomllib.load(f)
     data.setdefault("schedules", []).append(
         {"pipeline": pipeline, "cron": cron, "env": env, "step": step}
     )
@@ -253,12 +299,23 @@ def schedule_export_cron(
     if not sched_path.exists():
         typer.echo("ℹ️  no schedules.toml found.")
         raise typer.Exit(0)
-    data = tomllib.loads(sched_path.read_text())
-    typer.echo("# Add the following lines to your crontab:")
-    for s in data.get("schedules", []):
-        typer.echo(
-            f"""{s['cron']} cd {project_dir.resolve()} && transmutedb run {s['pipeline']} --env {s['env']} --step {s['step']} >> {log_path} 2>&1"""
+    with sched_path.open("rb") as f:
+        data = tomllib.load(f)
+    cwd = str(project_dir.resolve())
+    lines = ["# Add the following lines to your crontab:"]
+    lines.extend(
+        _CRON_LINE(
+            cron=s["cron"],
+            cwd=cwd,
+            pipeline=s["pipeline"],
+            env=s["env"],
+            step=s["step"],
+            log=log_path,
         )
+        for s in data.get("schedules", [])
+    )
+    # one write for the whole block instead of one echo per schedule
+    typer.echo("\n".join(lines))
 
 
 # --------------------------- entrypoint ------------------------------------
@@ -1,26 +1,44 @@
 """Configuration loader for TransmuteDB pipelines."""
 from __future__ import annotations
 
+import functools
+import tomllib
 from pathlib import Path
 from typing import Any, Optional
 
+from pydantic import TypeAdapter
+
 from transmutedb.config.models import PipelineConfig
 
+# Built once at import so every load reuses the compiled validator
+_PIPELINE_ADAPTER = TypeAdapter(PipelineConfig)
+
 
 def load_pipeline_config(config_path: Path) -> PipelineConfig:
     """
     Load and parse a pipeline configuration file.
     
+    Parsed configs are cached by resolved path, modification time and size,
+    so repeated loads of an unchanged file skip TOML parsing and validation.
+    The size catches edits made within one tick of a coarse filesystem
+    timestamp.
+    
     Args:
         config_path: Path to the pipeline TOML configuration file
         
     Returns:
-        Parsed PipelineConfig object
-        
-    Note: This is a placeholder implementation.
+        Parsed PipelineConfig object (shared between callers; it is frozen)
     """
-    # TODO: Implement actual config loading
-    raise NotImplementedError("load_pipeline_config not yet implemented")
+    path = Path(config_path).resolve()
+    stat = path.stat()
+    return _load_pipeline_config_cached(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=64)
+def _load_pipeline_config_cached(path: str, mtime_ns: int, size: int) -> PipelineConfig:
+    """Parse and validate a pipeline TOML; mtime_ns and size are part of the cache key."""
+    with open(path, "rb") as f:
+        return _PIPELINE_ADAPTER.validate_python(tomllib.load(f))
 
 
 def resolve_overrides(
@@ -1,7 +1,7 @@
 """Pydantic models for pipeline configuration."""
 from __future__ import annotations
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class PipelineConfig(BaseModel):
@@ -10,5 +10,8 @@ class PipelineConfig(BaseModel):
     
     Note: This is a placeholder implementation.
     """
+    # Frozen so a cached instance can be shared safely between loads
+    model_config = ConfigDict(frozen=True)
+
     name: str = "default"
     version: str = "0.1.0"
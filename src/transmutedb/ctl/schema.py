@@ -3,92 +3,138 @@ from __future__ import annotations
 
 from typing import Any
 
+# Bump when _CTL_DDL changes so existing databases pick up the new objects
+_CTL_VERSION = 1
+
+# One row per entity with column attributes as parallel arrays, in column_id
+# order. Shared by the packed view and the tier builders; {where} narrows the
+# rows before they are grouped.
+PACKED_COLUMNS_SQL = """SELECT
+        entity_id,
+        list(column_name ORDER BY column_id) AS column_names,
+        list(data_type ORDER BY column_id) AS data_types,
+        list(is_nullable ORDER BY column_id) AS is_nullable,
+        list(is_measure ORDER BY column_id) AS is_measure,
+        list(is_dimension ORDER BY column_id) AS is_dimension,
+        list(is_business_key ORDER BY column_id) AS is_business_key,
+        list(track_history ORDER BY column_id) AS track_history,
+        list(dq_rule_type ORDER BY column_id) AS dq_rule_types,
+        list(dq_rule_params ORDER BY column_id) AS dq_rule_params
+    FROM entity_column_metadata{where}
+    GROUP BY entity_id"""
+
+# All control DDL is submitted as one script so DuckDB parses it in a single call
+_CTL_DDL = f"""
+    -- run_log table for pipeline execution tracking
+    CREATE TABLE IF NOT EXISTS run_log (
+        run_id INTEGER PRIMARY KEY,
+        pipeline VARCHAR,
+        step VARCHAR,
+        entity VARCHAR,
+        started_at TIMESTAMP,
+        completed_at TIMESTAMP,
+        status VARCHAR,
+        rows_in BIGINT,
+        rows_out BIGINT,
+        error_message VARCHAR
+    );
+
+    -- sequence for run_id
+    CREATE SEQUENCE IF NOT EXISTS run_log_seq START 1;
+
+    -- dq_results table for data quality checks
+    CREATE TABLE IF NOT EXISTS dq_results (
+        dq_id INTEGER PRIMARY KEY,
+        run_id INTEGER,
+        pipeline VARCHAR,
+        entity VARCHAR,
+        check_name VARCHAR,
+        check_type VARCHAR,
+        passed BOOLEAN,
+        rows_checked BIGINT,
+        rows_failed BIGINT,
+        created_at TIMESTAMP
+    );
+
+    -- sequence for dq_id
+    CREATE SEQUENCE IF NOT EXISTS dq_results_seq START 1;
+
+    -- entity_metadata table for entity configurations
+    CREATE TABLE IF NOT EXISTS entity_metadata (
+        entity_id INTEGER PRIMARY KEY,
+        entity_name VARCHAR NOT NULL,
+        source_table VARCHAR,
+        target_schema VARCHAR DEFAULT 'gold',
+        entity_type VARCHAR DEFAULT 'fact',
+        description VARCHAR,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(entity_name)
+    );
+
+    -- sequence for entity_id
+    CREATE SEQUENCE IF NOT EXISTS entity_metadata_seq START 1;
+
+    -- entity_column_metadata table for column definitions and rules
+    CREATE TABLE IF NOT EXISTS entity_column_metadata (
+        column_id INTEGER PRIMARY KEY,
+        entity_id INTEGER NOT NULL,
+        column_name VARCHAR NOT NULL,
+        data_type VARCHAR NOT NULL,
+        is_nullable BOOLEAN DEFAULT TRUE,
+        is_measure BOOLEAN DEFAULT FALSE,
+        is_dimension BOOLEAN DEFAULT FALSE,
+        is_business_key BOOLEAN DEFAULT FALSE,
+        track_history BOOLEAN DEFAULT FALSE,
+        default_value VARCHAR,
+        description VARCHAR,
+        dq_rule_type VARCHAR,
+        dq_rule_params VARCHAR,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(entity_id, column_name),
+        FOREIGN KEY (entity_id) REFERENCES entity_metadata(entity_id)
+    );
+
+    -- sequence for column_id
+    CREATE SEQUENCE IF NOT EXISTS entity_column_metadata_seq START 1;
+
+    -- one row per entity with column attributes as parallel arrays; replaced
+    -- on every run so a version bump picks up a changed definition
+    CREATE OR REPLACE VIEW entity_column_metadata_packed AS
+    {PACKED_COLUMNS_SQL.format(where="")};
+
+    -- schema version of the objects above, written last
+    CREATE TABLE IF NOT EXISTS ctl_version (version INTEGER);
+    DELETE FROM ctl_version;
+    INSERT INTO ctl_version VALUES ({_CTL_VERSION});
+"""
+
 
 def ensure_ctl_tables(con: Any) -> None:
     """
     Ensure control/metadata tables exist in the database.
-    
+
+    A database whose ctl_version matches the current schema version is not
+    re-initialized, so repeat calls cost one catalog probe and one point
+    read.
+
     Args:
         con: Database connection
     """
-    # Create run_log table for pipeline execution tracking
-    con.execute("""
-        CREATE TABLE IF NOT EXISTS run_log (
-            run_id INTEGER PRIMARY KEY,
-            pipeline VARCHAR,
-            step VARCHAR,
-            entity VARCHAR,
-            started_at TIMESTAMP,
-            completed_at TIMESTAMP,
-            status VARCHAR,
-            rows_in BIGINT,
-            rows_out BIGINT,
-            error_message VARCHAR
-        )
-    """)
-    
-    # Create sequence for run_id
-    con.execute("CREATE SEQUENCE IF NOT EXISTS run_log_seq START 1")
-    
-    # Create dq_results table for data quality checks
-    con.execute("""
-        CREATE TABLE IF NOT EXISTS dq_results (
-            dq_id INTEGER PRIMARY KEY,
-            run_id INTEGER,
-            pipeline VARCHAR,
-            entity VARCHAR,
-            check_name VARCHAR,
-            check_type VARCHAR,
-            passed BOOLEAN,
-            rows_checked BIGINT,
-            rows_failed BIGINT,
-            created_at TIMESTAMP
-        )
-    """)
-    
-    # Create sequence for dq_id
-    con.execute("CREATE SEQUENCE IF NOT EXISTS dq_results_seq START 1")
-    
-    # Create entity_metadata table for entity configurations
-    con.execute("""
-        CREATE TABLE IF NOT EXISTS entity_metadata (
-            entity_id INTEGER PRIMARY KEY,
-            entity_name VARCHAR NOT NULL,
-            source_table VARCHAR,
-            target_schema VARCHAR DEFAULT 'gold',
-            entity_type VARCHAR DEFAULT 'fact',
-            description VARCHAR,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(entity_name)
-        )
-    """)
-    
-    # Create sequence for entity_id
-    con.execute("CREATE SEQUENCE IF NOT EXISTS entity_metadata_seq START 1")
-    
-    # Create entity_column_metadata table for column definitions and rules
-    con.execute("""
-        CREATE TABLE IF NOT EXISTS entity_column_metadata (
-            column_id INTEGER PRIMARY KEY,
-            entity_id INTEGER NOT NULL,
-            column_name VARCHAR NOT NULL,
-            data_type VARCHAR NOT NULL,
-            is_nullable BOOLEAN DEFAULT TRUE,
-            is_measure BOOLEAN DEFAULT FALSE,
-            is_dimension BOOLEAN DEFAULT FALSE,
-            is_business_key BOOLEAN DEFAULT FALSE,
-            track_history BOOLEAN DEFAULT FALSE,
-            default_value VARCHAR,
-            description VARCHAR,
-            dq_rule_type VARCHAR,
-            dq_rule_params VARCHAR,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(entity_id, column_name),
-            FOREIGN KEY (entity_id) REFERENCES entity_metadata(entity_id)
-        )
-    """)
-    
-    # Create sequence for column_id
-    con.execute("CREATE SEQUENCE IF NOT EXISTS entity_column_metadata_seq START 1")
+    # Initialized databases record their schema version; probe the catalog
+    # first so a missing table never raises inside the caller's transaction
+    has_version = con.execute(
+        """
+        SELECT 1 FROM duckdb_tables()
+        WHERE database_name = current_database()
+            AND schema_name = current_schema()
+            AND table_name = 'ctl_version'
+        """
+    ).fetchone()
+    if has_version:
+        version = con.execute("SELECT max(version) FROM ctl_version").fetchone()[0]
+        if version == _CTL_VERSION:
+            return
+
+    con.execute(_CTL_DDL)
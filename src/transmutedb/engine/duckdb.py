@@ -1,44 +1,88 @@
 """DuckDB engine utilities."""
 from __future__ import annotations
 
-from typing import Any
+import re
+from typing import Any, Dict, Literal, Optional, Sequence
 
 import duckdb
 
+# duckdb://file:path or duckdb://path; anything else is taken as a plain path
+_URI_RE = re.compile(r"duckdb://(?:file:)?(.*)", re.DOTALL)
 
-def connect(uri: str) -> duckdb.DuckDBPyConnection:
+# Rows per Arrow batch when streaming results with format="arrow"
+_RECORD_BATCH_ROWS = 1024
+
+
+def parse_uri(uri: str) -> str:
+    """
+    Extract the database path from a connection URI.
+    
+    Args:
+        uri: Connection URI (e.g., 'duckdb://file:db.duckdb') or a plain path
+        
+    Returns:
+        Database path to pass to DuckDB
+    """
+    m = _URI_RE.match(uri)
+    return m.group(1) if m else uri
+
+
+def connect(
+    uri: str,
+    read_only: bool = False,
+    config: Optional[Dict[str, Any]] = None,
+) -> duckdb.DuckDBPyConnection:
     """
     Connect to a DuckDB database.
     
     Args:
         uri: Connection URI (e.g., 'duckdb://file:db.duckdb')
+        read_only: Open without write access, so the file is never created
+            or modified. The database file must already exist, and DuckDB
+            refuses the connection while another process has the file open
+            for writing.
+        config: DuckDB startup settings such as threads, memory_limit or
+            preserve_insertion_order; anything not set here follows DuckDB's
+            own defaults. DuckDB rejects a connection whose settings differ
+            from another connection already open on the same file in this
+            process.
         
     Returns:
         DuckDB connection object
     """
     # Parse URI - support duckdb://file:path format
-    if uri.startswith("duckdb://file:"):
-        db_path = uri.replace("duckdb://file:", "")
-    elif uri.startswith("duckdb://"):
-        db_path = uri.replace("duckdb://", "")
-    else:
-        db_path = uri
+    db_path = parse_uri(uri)
     
-    return duckdb.connect(db_path)
+    return duckdb.connect(db_path, read_only=read_only, config=config or {})
 
 
-def fetch_df(con: duckdb.DuckDBPyConnection, query: str) -> Any:
+def fetch_df(
+    con: duckdb.DuckDBPyConnection,
+    query: str,
+    params: Optional[Sequence[Any]] = None,
+    format: Literal["polars", "arrow", "rows"] = "polars",
+) -> Any:
     """
-    Execute a query and return results as a DataFrame.
+    Execute a query and return the results in the requested shape.
     
     Args:
         con: Database connection
-        query: SQL query to execute
+        query: SQL query to execute, using ? placeholders for params
+        params: Optional values bound to the query placeholders
+        format: 'polars' for a DataFrame, 'arrow' for a streaming
+            pyarrow RecordBatchReader, 'rows' for a list of tuples
         
     Returns:
-        Query results as DataFrame (Polars)
-        
-    Note: This is a placeholder implementation.
+        Query results in the requested format
     """
-    # TODO: Return polars DataFrame
-    return con.execute(query).pl()
+    result = con.execute(query, params)
+    if format == "rows":
+        return result.fetchall()
+    if format == "arrow":
+        # to_arrow_reader supersedes fetch_record_batch in newer DuckDB releases
+        if hasattr(result, "to_arrow_reader"):
+            return result.to_arrow_reader(_RECORD_BATCH_ROWS)
+        return result.fetch_record_batch(_RECORD_BATCH_ROWS)
+    if format == "polars":
+        return result.pl()
+    raise ValueError(f"Unknown fetch format '{format}'. Expected polars, arrow or rows.")
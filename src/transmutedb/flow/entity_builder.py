@@ -1,18 +1,34 @@
 """Entity builder for metadata-driven entities across bronze, silver, and gold tiers."""
 from __future__ import annotations
 
-import hashlib
+import functools
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 import polars as pl
 
+from transmutedb.ctl.schema import PACKED_COLUMNS_SQL
 
+# Basic SQL data types, optionally with precision, e.g. DECIMAL(10,2)
+_DTYPE_RE = re.compile(r'^[A-Z]+(\([0-9,\s]+\))?\Z')
+
+# Columns added by the tier builders; never part of the source row hash
+_METADATA_COLS = frozenset({"_load_date", "_row_hash", "_valid_from", "_is_valid"})
+
+# Hex digits of the MD5 row digest kept in _row_hash (64 bits, a UBIGINT);
+# changing the encoding below marks every stored row as changed
+_ROW_HASH_HEX_DIGITS = 16
+
+
+@functools.lru_cache(maxsize=4096)
 def _validate_identifier(identifier: str, identifier_type: str = "identifier") -> str:
     """
     Validate SQL identifier to prevent injection.
     
+    Results are memoized, so re-validating the same schema, entity or column
+    name across tier builds is a cache hit. Invalid identifiers always raise.
+    
     Args:
         identifier: The identifier to validate (schema name, table name, column name)
         identifier_type: Type of identifier for error messages
@@ -23,8 +39,9 @@ def _validate_identifier(identifier: str, identifier_type: str = "identifier") -
     Raises:
         ValueError: If identifier is invalid
     """
-    # Allow alphanumeric, underscore, and limit length
-    if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', identifier):
+    # Allow alphanumeric, underscore, and limit length. For ASCII strings
+    # str.isidentifier() is exactly [a-zA-Z_][a-zA-Z0-9_]*, checked in C.
+    if not (identifier.isascii() and identifier.isidentifier()):
         raise ValueError(
             f"Invalid {identifier_type} '{identifier}'. "
             "Must start with letter or underscore and contain only alphanumeric characters and underscores."
@@ -34,6 +51,123 @@ def _validate_identifier(identifier: str, identifier_type: str = "identifier") -
     return identifier
 
 
+@functools.lru_cache(maxsize=256)
+def _is_valid_data_type(data_type: str) -> bool:
+    """
+    Check that a metadata data type is a plain SQL type name.
+    
+    Warehouses use a handful of distinct types, so results are memoized.
+    
+    Args:
+        data_type: SQL data type, optionally with precision, e.g. DECIMAL(10,2)
+    
+    Returns:
+        True if the data type is safe to interpolate into DDL
+    """
+    return _DTYPE_RE.match(data_type.upper().strip()) is not None
+
+
+def _get_entity_id(con: Any, entity_name: str) -> int:
+    """
+    Look up an entity's id.
+    
+    Not cached: a point lookup on the unique entity_name is cheap, and a
+    cache would miss renames, rollbacks and writes from other connections.
+    
+    Args:
+        con: Database connection
+        entity_name: Name of the entity
+    
+    Returns:
+        entity_id of the entity
+        
+    Raises:
+        ValueError: If the entity is not in entity_metadata
+    """
+    entity = con.execute(
+        "SELECT entity_id FROM entity_metadata WHERE entity_name = ?",
+        [entity_name]
+    ).fetchone()
+    
+    if not entity:
+        raise ValueError(f"Entity '{entity_name}' not found in metadata")
+    
+    return entity[0]
+
+
+def _fetch_column_meta(con: Any, entity_id: int, fields: Sequence[str]) -> List[tuple]:
+    """
+    Fetch column metadata for an entity as one packed row.
+    
+    All attributes arrive as parallel arrays in a single row, so each build
+    reads its column metadata with one point query. The query runs the
+    entity_column_metadata_packed view's definition on entity_column_metadata
+    directly, so control databases created before the view existed work too.
+    
+    Args:
+        con: Database connection
+        entity_id: Entity to fetch columns for
+        fields: Array columns of entity_column_metadata_packed to select
+    
+    Returns:
+        One tuple per column (in column_id order) with the requested fields
+    """
+    cursor = con.execute(
+        PACKED_COLUMNS_SQL.format(where="\n    WHERE entity_id = ?"),
+        [entity_id]
+    )
+    row = cursor.fetchone()
+    if not row:
+        return []
+    packed = dict(zip((d[0] for d in cursor.description), row, strict=True))
+    return list(zip(*(packed[f] for f in fields), strict=True))
+
+
+def _row_hash_expr(columns: Sequence[str]) -> str:
+    """
+    Build the SQL expression for the _row_hash fingerprint of a row.
+    
+    Each column is cast to DuckDB's text form and the values are encoded as
+    a JSON list, which keeps nulls and embedded separators distinct. The
+    first 64 bits of the MD5 of that string become a UBIGINT. Both steps
+    are fixed formats, so stored hashes stay comparable across DuckDB and
+    Polars upgrades.
+    
+    Args:
+        columns: Source column names, in table order
+    
+    Returns:
+        SQL expression evaluating to the row hash
+    """
+    quoted = ('"' + col.replace('"', '""') + '"' for col in columns)
+    values = ", ".join(f"CAST({col} AS VARCHAR)" for col in quoted)
+    return (
+        f"('0x' || left(md5(to_json([{values}])), {_ROW_HASH_HEX_DIGITS}))::UBIGINT"
+    )
+
+
+def ensure_schemas(con: Any, *names: str) -> None:
+    """
+    Create the given schemas if they don't exist.
+    
+    All schemas are created with one script of CREATE SCHEMA IF NOT EXISTS
+    statements, so the tier builders call this on every entity. Pipelines
+    may also call it up front with all their schemas.
+    
+    Args:
+        con: Database connection
+        names: Schema names to create
+    
+    Raises:
+        ValueError: If a schema name is invalid
+    """
+    schemas = [_validate_identifier(name, "schema name") for name in dict.fromkeys(names)]
+    if not schemas:
+        return
+    
+    con.execute("".join(f"CREATE SCHEMA IF NOT EXISTS {name};\n" for name in schemas))
+
+
 def load_bronze_entity(
     con: Any,
     entity_name: str,
@@ -58,43 +192,46 @@ def load_bronze_entity(
     Returns:
         DataFrame with metadata columns added
     """
-    # Add metadata columns
-    df = source_data.clone()
-    
-    # Add load_date timestamp
-    df = df.with_columns([
-        pl.lit(datetime.now()).alias("_load_date")
-    ])
-    
-    # Calculate row hash for change detection
-    # Concatenate all columns (except metadata) and hash
-    # Using SHA256 for better collision resistance
-    original_columns = [col for col in source_data.columns]
-    df = df.with_columns([
-        pl.concat_str(original_columns, separator="|").map_elements(
-            lambda x: hashlib.sha256(x.encode()).hexdigest(),
-            return_dtype=pl.Utf8
-        ).alias("_row_hash")
-    ])
-    
     # Validate identifiers
-    _validate_identifier(entity_name, "entity name")
-    _validate_identifier(bronze_schema, "schema name")
+    entity_name = _validate_identifier(entity_name, "entity name")
+    bronze_schema = _validate_identifier(bronze_schema, "schema name")
+    
+    # Capture the load timestamp once so every row of this load shares it
+    load_ts = datetime.now()
+    
+    # Add the load timestamp for the audit trail; with_columns never mutates
+    # source_data, so no clone is needed. A _row_hash carried over from an
+    # earlier load is dropped and recomputed below.
+    original_columns = [c for c in source_data.columns if c not in _METADATA_COLS]
+    df = (
+        source_data.drop("_row_hash", strict=False)
+        .with_columns(pl.lit(load_ts).alias("_load_date"))
+    )
     
     # Create bronze schema if it doesn't exist
-    con.execute(f"CREATE SCHEMA IF NOT EXISTS {bronze_schema}")
+    ensure_schemas(con, bronze_schema)
     
-    # Create or replace bronze table using register and CTAS
+    # Create or replace bronze table with a CTAS over the frame's Arrow data
     table_name = f"{bronze_schema}.{entity_name}_bronze"
     
-    # Register the polars dataframe as a DuckDB view temporarily
-    con.register("_temp_bronze_df", df)
-    
-    # Create table from the registered dataframe
-    con.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM _temp_bronze_df")
-    
-    # Unregister the temporary view
-    con.unregister("_temp_bronze_df")
+    # to_arrow() shares Polars' buffers; DuckDB's replacement scan resolves the
+    # local name in the query directly, so no register/unregister is needed.
+    # The underscore names keep them from clashing with warehouse tables.
+    # _row_hash is computed in SQL over all source columns for change
+    # detection (compared for equality, not security). Only the hash column
+    # comes back, ordered by row index so it lines up with the frame even
+    # when the connection doesn't preserve insertion order.
+    _bronze_arrow = df.select(original_columns).with_row_index("_bronze_row").to_arrow()
+    row_hash = con.execute(f"""
+        SELECT {_row_hash_expr(original_columns)} AS _row_hash
+        FROM _bronze_arrow
+        ORDER BY _bronze_row
+    """).pl().to_series()
+    df = df.with_columns(row_hash)
+    
+    _bronze_arrow = df.to_arrow()
+    con.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM _bronze_arrow")
+    del _bronze_arrow
     
     return df
 
@@ -129,97 +266,87 @@ def process_silver_entity(
     _validate_identifier(silver_schema, "schema name")
     
     # Get entity metadata
-    entity_meta = con.execute(
-        "SELECT entity_id, source_table FROM entity_metadata WHERE entity_name = ?",
-        [entity_name]
-    ).fetchone()
-    
-    if not entity_meta:
-        raise ValueError(f"Entity '{entity_name}' not found in metadata")
-    
-    entity_id = entity_meta[0]
+    entity_id = _get_entity_id(con, entity_name)
     
     # Get column metadata with type and validation rules
-    column_meta = con.execute(
-        """
-        SELECT column_name, data_type, is_nullable, dq_rule_type, dq_rule_params
-        FROM entity_column_metadata
-        WHERE entity_id = ?
-        ORDER BY column_id
-        """,
-        [entity_id]
-    ).fetchall()
+    column_meta = _fetch_column_meta(
+        con,
+        entity_id,
+        ("column_names", "data_types", "is_nullable", "dq_rule_types", "dq_rule_params"),
+    )
     
     if not column_meta:
         raise ValueError(f"No column metadata found for entity '{entity_name}'")
     
     # Create silver schema if it doesn't exist
-    con.execute(f"CREATE SCHEMA IF NOT EXISTS {silver_schema}")
+    ensure_schemas(con, silver_schema)
     
-    # Build column definitions for CREATE TABLE
-    column_defs = []
+    # Build the typed select list and collect NOT NULL columns
+    select_columns = []
+    not_null_casts = {}
     for col_name, data_type, is_nullable, dq_rule_type, dq_rule_params in column_meta:
         # Validate column name and data type
         _validate_identifier(col_name, "column name")
         # Basic validation of data type (allow common SQL types)
-        if not re.match(r'^[A-Z]+(\([0-9,\s]+\))?$', data_type.upper().strip()):
+        if not _is_valid_data_type(data_type):
             raise ValueError(f"Invalid data type '{data_type}' for column '{col_name}'")
         
-        null_constraint = "NULL" if is_nullable else "NOT NULL"
-        column_defs.append(f"{col_name} {data_type} {null_constraint}")
-    
-    # Add metadata columns
-    column_defs.append("_load_date TIMESTAMP NOT NULL")
-    column_defs.append("_row_hash VARCHAR")
-    column_defs.append("_valid_from TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
-    column_defs.append("_is_valid BOOLEAN DEFAULT TRUE")
+        # Cast to appropriate type
+        cast_expr = f"TRY_CAST({col_name} AS {data_type})"
+        select_columns.append(f"{cast_expr} AS {col_name}")
+        if not is_nullable:
+            not_null_casts[col_name] = cast_expr
     
-    # Create silver table with proper schema
     silver_table = f"{silver_schema}.{entity_name}_silver"
     bronze_table = f"{bronze_schema}.{entity_name}_bronze"
     
-    create_sql = f"""
-        CREATE OR REPLACE TABLE {silver_table} (
-            {', '.join(column_defs)}
+    # Check NOT NULL columns against bronze before touching silver, so a
+    # violation leaves the previous silver table in place
+    if not_null_casts:
+        null_count_cols = ", ".join(
+            f"COUNT(*) FILTER (WHERE {expr} IS NULL)" for expr in not_null_casts.values()
         )
-    """
-    con.execute(create_sql)
-    
-    # Insert data with type casting and validation
-    column_names = [col[0] for col in column_meta]
-    select_columns = []
-    
-    for col_name, data_type, is_nullable, dq_rule_type, dq_rule_params in column_meta:
-        # Cast to appropriate type
-        select_columns.append(f"TRY_CAST({col_name} AS {data_type}) AS {col_name}")
+        null_counts = con.execute(
+            f"SELECT {null_count_cols} FROM {bronze_table}"
+        ).fetchone()
+        for col_name, null_count in zip(not_null_casts, null_counts, strict=True):
+            if null_count:
+                raise ValueError(
+                    f"Column '{col_name}' of entity '{entity_name}' is NOT NULL but "
+                    f"{null_count} bronze rows are NULL or fail the type cast"
+                )
     
-    insert_sql = f"""
-        INSERT INTO {silver_table}
+    # Create and fill the silver table in one CTAS so DuckDB plans the casts and
+    # the write as a single pipeline; the CTAS result is its inserted row count
+    total_rows = con.execute(f"""
+        CREATE OR REPLACE TABLE {silver_table} AS
         SELECT 
             {', '.join(select_columns)},
             _load_date,
             _row_hash,
-            CURRENT_TIMESTAMP AS _valid_from,
+            CURRENT_TIMESTAMP::TIMESTAMP AS _valid_from,
             TRUE AS _is_valid
         FROM {bronze_table}
-    """
-    con.execute(insert_sql)
+    """).fetchone()[0]
     
-    # Gather statistics
-    stats = con.execute(f"""
-        SELECT 
-            COUNT(*) as total_rows,
-            COUNT(CASE WHEN _is_valid = TRUE THEN 1 END) as valid_rows,
-            COUNT(CASE WHEN _is_valid = FALSE THEN 1 END) as invalid_rows
-        FROM {silver_table}
-    """).fetchone()
+    # Declare NOT NULL constraints; the loaded rows were checked above and
+    # metadata columns are always populated
+    con.execute("".join(
+        f"ALTER TABLE {silver_table} ALTER COLUMN {col} SET NOT NULL;\n"
+        for col in [*not_null_casts, "_load_date"]
+    ))
+    
+    # Every row is currently loaded with _is_valid = TRUE, so the validity
+    # split is known without re-scanning the table
+    valid_rows = total_rows
+    invalid_rows = 0
     
     return {
         "entity_name": entity_name,
         "silver_table": silver_table,
-        "total_rows": stats[0],
-        "valid_rows": stats[1],
-        "invalid_rows": stats[2],
+        "total_rows": total_rows,
+        "valid_rows": valid_rows,
+        "invalid_rows": invalid_rows,
     }
 
 
@@ -271,18 +398,12 @@ def build_gold_entity(
         return build_type2_dimension(con, entity_name, silver_schema, target_schema)
     
     # Get column metadata
-    column_meta = con.execute(
-        """
-        SELECT column_name, data_type, is_measure, is_dimension
-        FROM entity_column_metadata
-        WHERE entity_id = ?
-        ORDER BY column_id
-        """,
-        [entity_id]
-    ).fetchall()
+    column_meta = _fetch_column_meta(
+        con, entity_id, ("column_names", "data_types", "is_measure", "is_dimension")
+    )
     
     # Create gold schema if it doesn't exist
-    con.execute(f"CREATE SCHEMA IF NOT EXISTS {target_schema}")
+    ensure_schemas(con, target_schema)
     
     # Separate measures and dimensions but preserve order
     measure_cols = []
@@ -317,12 +438,12 @@ def build_gold_entity(
         FROM {silver_table}
         WHERE _is_valid = TRUE
     """
-    con.execute(create_sql)
+    # The CTAS result is its inserted row count
+    total_rows = con.execute(create_sql).fetchone()[0]
     
     # Gather statistics
     stats = con.execute(f"""
         SELECT 
-            COUNT(*) as total_rows,
             MIN(_valid_from) as earliest_record,
             MAX(_valid_from) as latest_record
         FROM {gold_table}
@@ -332,11 +453,11 @@ def build_gold_entity(
         "entity_name": entity_name,
         "gold_table": gold_table,
         "entity_type": entity_type,
-        "total_rows": stats[0],
+        "total_rows": total_rows,
         "measures": measure_cols,
         "dimensions": dimension_cols,
-        "earliest_record": stats[1],
-        "latest_record": stats[2],
+        "earliest_record": stats[0],
+        "latest_record": stats[1],
     }
 
 
@@ -371,26 +492,12 @@ def build_type2_dimension(
     _validate_identifier(gold_schema, "schema name")
     
     # Get entity metadata
-    entity_meta = con.execute(
-        "SELECT entity_id FROM entity_metadata WHERE entity_name = ?",
-        [entity_name]
-    ).fetchone()
-    
-    if not entity_meta:
-        raise ValueError(f"Entity '{entity_name}' not found in metadata")
-    
-    entity_id = entity_meta[0]
+    entity_id = _get_entity_id(con, entity_name)
     
     # Get column metadata including business keys
-    column_meta = con.execute(
-        """
-        SELECT column_name, data_type, is_business_key, track_history
-        FROM entity_column_metadata
-        WHERE entity_id = ?
-        ORDER BY column_id
-        """,
-        [entity_id]
-    ).fetchall()
+    column_meta = _fetch_column_meta(
+        con, entity_id, ("column_names", "data_types", "is_business_key", "track_history")
+    )
     
     # Identify business keys and tracked columns
     business_keys = []
@@ -400,6 +507,8 @@ def build_type2_dimension(
     
     for col_name, data_type, is_business_key, track_history in column_meta:
         _validate_identifier(col_name, "column name")
+        if not _is_valid_data_type(data_type):
+            raise ValueError(f"Invalid data type '{data_type}' for column '{col_name}'")
         all_cols.append(col_name)
         col_types[col_name] = data_type
         if is_business_key:
@@ -411,16 +520,16 @@ def build_type2_dimension(
         raise ValueError(f"Type 2 dimension '{entity_name}' must have at least one business key column")
     
     # Create gold schema if it doesn't exist
-    con.execute(f"CREATE SCHEMA IF NOT EXISTS {gold_schema}")
+    ensure_schemas(con, gold_schema)
     
     gold_table = f"{gold_schema}.{entity_name}"
     silver_table = f"{silver_schema}.{entity_name}_silver"
     
     # Check if dimension table exists
-    table_exists = con.execute(f"""
-        SELECT COUNT(*) FROM information_schema.tables 
-        WHERE table_schema = '{gold_schema}' AND table_name = '{entity_name}'
-    """).fetchone()[0] > 0
+    table_exists = con.execute(
+        "SELECT 1 FROM duckdb_tables() WHERE schema_name = ? AND table_name = ? LIMIT 1",
+        [gold_schema, entity_name]
+    ).fetchone() is not None
     
     if not table_exists:
         # Initial load - create table with SCD2 columns
@@ -434,22 +543,22 @@ def build_type2_dimension(
                 _valid_to TIMESTAMP,
                 _is_current BOOLEAN NOT NULL DEFAULT TRUE,
                 _load_date TIMESTAMP NOT NULL,
-                _row_hash VARCHAR
+                _row_hash UBIGINT
             )
         """
         con.execute(create_sql)
         
-        # Create sequence for surrogate keys
-        con.execute(f"CREATE SEQUENCE IF NOT EXISTS {entity_name}_key_seq START 1")
-        
         # Insert initial records from silver
         business_key_str = ", ".join(business_keys)
         all_cols_str = ", ".join(all_cols)
         
+        # Number the initial load with a window over the new, empty table
+        # rather than a per-row nextval. Ordering by business key keeps the
+        # keys reproducible when DuckDB doesn't preserve insertion order.
         insert_sql = f"""
             INSERT INTO {gold_table}
             SELECT 
-                nextval('{entity_name}_key_seq') as {entity_name}_key,
+                ROW_NUMBER() OVER (ORDER BY {business_key_str}) as {entity_name}_key,
                 {all_cols_str},
                 _valid_from,
                 NULL as _valid_to,
@@ -459,9 +568,14 @@ def build_type2_dimension(
             FROM {silver_table}
             WHERE _is_valid = TRUE
         """
-        con.execute(insert_sql)
+        # The table was just created, so the inserted count is its row count
+        rows_inserted = con.execute(insert_sql).fetchone()[0]
         
-        rows_inserted = con.execute(f"SELECT COUNT(*) FROM {gold_table}").fetchone()[0]
+        # Start the surrogate key sequence after the keys used above; replace
+        # any sequence left over from a previously dropped dimension table
+        con.execute(
+            f"CREATE OR REPLACE SEQUENCE {entity_name}_key_seq START {rows_inserted + 1}"
+        )
         
         return {
             "entity_name": entity_name,
@@ -476,70 +590,74 @@ def build_type2_dimension(
     else:
         # Incremental load - apply SCD2 logic
         business_key_join = " AND ".join([f"dim.{k} = src.{k}" for k in business_keys])
-        all_cols_str = ", ".join(all_cols)
         
-        # Count records that will be closed (have changed)
-        updated_rows = con.execute(f"""
-            SELECT COUNT(*)
-            FROM {gold_table} dim
-            JOIN {silver_table} src ON {business_key_join}
-            WHERE dim._is_current = TRUE
-                AND dim._row_hash != src._row_hash
-                AND src._is_valid = TRUE
-        """).fetchone()[0]
-        
-        # Count new records BEFORE insert
-        new_rows = con.execute(f"""
-            SELECT COUNT(*)
-            FROM {silver_table} src
-            WHERE src._is_valid = TRUE
-                AND NOT EXISTS (
-                    SELECT 1 FROM {gold_table} dim
-                    WHERE {business_key_join}
-                )
-        """).fetchone()[0]
+        # Dimensions built before _row_hash became a UBIGINT store it as a SHA-256
+        # hex VARCHAR that cannot be compared with the new hashes. Convert the
+        # column, then copy the silver hash onto current versions whose values
+        # still match; versions that really changed keep a NULL hash and are
+        # closed below.
+        row_hash_type = con.execute(
+            "SELECT data_type FROM duckdb_columns() "
+            "WHERE schema_name = ? AND table_name = ? AND column_name = '_row_hash'",
+            [gold_schema, entity_name]
+        ).fetchone()
+        if row_hash_type is not None and row_hash_type[0] != "UBIGINT":
+            con.execute(
+                f"ALTER TABLE {gold_table} ALTER COLUMN _row_hash SET DATA TYPE UBIGINT USING NULL"
+            )
+            values_match = " AND ".join(
+                [f"dim.{col} IS NOT DISTINCT FROM src.{col}" for col in all_cols]
+            )
+            con.execute(f"""
+                UPDATE {gold_table} dim
+                SET _row_hash = src._row_hash
+                FROM {silver_table} src
+                WHERE {business_key_join}
+                    AND dim._is_current = TRUE
+                    AND src._is_valid = TRUE
+                    AND {values_match}
+            """)
         
-        # Close records that have changed
-        con.execute(f"""
+        # Close current versions whose row hash changed; the UPDATE result
+        # is the number of closed versions
+        updated_rows = con.execute(f"""
             UPDATE {gold_table} dim
             SET _valid_to = CURRENT_TIMESTAMP,
                 _is_current = FALSE
             FROM {silver_table} src
             WHERE {business_key_join}
                 AND dim._is_current = TRUE
-                AND dim._row_hash != src._row_hash
+                AND dim._row_hash IS DISTINCT FROM src._row_hash
                 AND src._is_valid = TRUE
-        """)
-        
-        # Build proper column list with src prefix
-        src_cols_str = ", ".join([f"src.{col}" for col in all_cols])
+        """).fetchone()[0]
         
-        # Insert new versions of changed records (match on business key + different hash)
-        con.execute(f"""
-            INSERT INTO {gold_table}
-            SELECT 
-                nextval('{entity_name}_key_seq') as {entity_name}_key,
-                {src_cols_str},
-                src._valid_from,
-                NULL as _valid_to,
-                TRUE as _is_current,
-                src._load_date,
-                src._row_hash
+        # Rows to insert: valid silver rows without a current version, i.e.
+        # brand-new business keys plus replacements for the versions closed
+        # above. Unchanged rows are filtered out before nextval runs, so
+        # surrogate keys are only drawn for rows that are inserted.
+        insert_source = f"""
             FROM {silver_table} src
             WHERE src._is_valid = TRUE
-                AND EXISTS (
+                AND NOT EXISTS (
                     SELECT 1 FROM {gold_table} dim
                     WHERE {business_key_join}
+                        AND dim._is_current = TRUE
                 )
+        """
+        
+        # Of those, rows whose business key has no version at all are new
+        new_rows = con.execute(f"""
+            SELECT COUNT(*)
+            {insert_source}
                 AND NOT EXISTS (
                     SELECT 1 FROM {gold_table} dim
                     WHERE {business_key_join}
-                        AND dim._row_hash = src._row_hash
-                        AND dim._is_current = TRUE
                 )
-        """)
+        """).fetchone()[0]
+        
+        # Build proper column list with src prefix
+        src_cols_str = ", ".join([f"src.{col}" for col in all_cols])
         
-        # Insert completely new records (business keys not in dimension)
         con.execute(f"""
             INSERT INTO {gold_table}
             SELECT 
@@ -550,12 +668,7 @@ def build_type2_dimension(
                 TRUE as _is_current,
                 src._load_date,
                 src._row_hash
-            FROM {silver_table} src
-            WHERE src._is_valid = TRUE
-                AND NOT EXISTS (
-                    SELECT 1 FROM {gold_table} dim
-                    WHERE {business_key_join}
-                )
+            {insert_source}
         """)
         
         total_rows = con.execute(f"SELECT COUNT(*) FROM {gold_table}").fetchone()[0]
@@ -602,7 +715,9 @@ def update_entity_metadata(
     ).fetchone()
     
     if existing:
-        # Update existing
+        # Update existing; a plain UPDATE keeps rows in entity_column_metadata
+        # that reference this entity valid, where ON CONFLICT DO UPDATE would
+        # trip their foreign key
         con.execute(
             """
             UPDATE entity_metadata 
@@ -618,9 +733,11 @@ def update_entity_metadata(
         return existing[0]
     else:
         # Insert new
-        con.execute(
+        row = con.execute(
             """
-            INSERT INTO entity_metadata (entity_id, entity_name, source_table, target_schema, entity_type, description)
+            INSERT INTO entity_metadata (
+                entity_id, entity_name, source_table, target_schema, entity_type, description
+            )
             VALUES (
                 nextval('entity_metadata_seq'),
                 ?,
@@ -629,11 +746,11 @@ def update_entity_metadata(
                 ?,
                 ?
             )
+            RETURNING entity_id
             """,
             [entity_name, source_table or '', target_schema, entity_type, description or '']
-        )
-        result = con.execute("SELECT currval('entity_metadata_seq')").fetchone()
-        return result[0]
+        ).fetchone()
+        return row[0]
 
 
 def add_entity_column(
@@ -672,19 +789,48 @@ def add_entity_column(
     Returns:
         column_id of the created record
     """
-    # Get entity_id
-    entity = con.execute(
-        "SELECT entity_id FROM entity_metadata WHERE entity_name = ?",
-        [entity_name]
-    ).fetchone()
+    return add_entity_columns(con, entity_name, [{
+        "column_name": column_name,
+        "data_type": data_type,
+        "is_nullable": is_nullable,
+        "is_measure": is_measure,
+        "is_dimension": is_dimension,
+        "is_business_key": is_business_key,
+        "track_history": track_history,
+        "default_value": default_value,
+        "description": description,
+        "dq_rule_type": dq_rule_type,
+        "dq_rule_params": dq_rule_params,
+    }])[0]
+
+
+def add_entity_columns(
+    con: Any,
+    entity_name: str,
+    columns: List[Dict[str, Any]],
+) -> List[int]:
+    """
+    Add several column definitions to entity metadata in one batch.
     
-    if not entity:
-        raise ValueError(f"Entity '{entity_name}' not found in metadata")
+    Each dict takes the same keys as the keyword arguments of
+    add_entity_column; only column_name and data_type are required.
     
-    entity_id = entity[0]
+    Args:
+        con: Database connection
+        entity_name: Name of the entity
+        columns: Column definitions, in the order they should be registered
+    
+    Returns:
+        column_ids of the created records, in the order of columns
+    """
+    # Get entity_id once for the whole batch
+    entity_id = _get_entity_id(con, entity_name)
     
-    # Insert column metadata
-    con.execute(
+    if not columns:
+        return []
+    
+    # Insert all column metadata rows with a single prepared statement
+    con.executemany(
         """
         INSERT INTO entity_column_metadata (
             column_id, entity_id, column_name, data_type, is_nullable,
@@ -692,37 +838,35 @@ def add_entity_column(
             default_value, description,
             dq_rule_type, dq_rule_params
         )
-        VALUES (
-            nextval('entity_column_metadata_seq'),
-            ?,
-            ?,
-            ?,
-            ?,
-            ?,
-            ?,
-            ?,
-            ?,
-            ?,
-            ?,
-            ?,
-            ?
-        )
+        VALUES (nextval('entity_column_metadata_seq'), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         [
-            entity_id,
-            column_name,
-            data_type,
-            is_nullable,
-            is_measure,
-            is_dimension,
-            is_business_key,
-            track_history,
-            default_value,
-            description,
-            dq_rule_type,
-            dq_rule_params
+            [
+                entity_id,
+                c["column_name"],
+                c["data_type"],
+                c.get("is_nullable", True),
+                c.get("is_measure", False),
+                c.get("is_dimension", False),
+                c.get("is_business_key", False),
+                c.get("track_history", False),
+                c.get("default_value"),
+                c.get("description"),
+                c.get("dq_rule_type"),
+                c.get("dq_rule_params"),
+            ]
+            for c in columns
         ]
     )
     
-    result = con.execute("SELECT currval('entity_column_metadata_seq')").fetchone()
-    return result[0]
+    # The batch took the most recent ids of the sequence for this entity
+    rows = con.execute(
+        """
+        SELECT column_id FROM entity_column_metadata
+        WHERE entity_id = ?
+        ORDER BY column_id DESC
+        LIMIT ?
+        """,
+        [entity_id, len(columns)]
+    ).fetchall()
+    return [r[0] for r in reversed(rows)]
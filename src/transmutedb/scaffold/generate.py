@@ -6,66 +6,10 @@ from typing import Any
 
 import duckdb
 
+from transmutedb.ctl.schema import ensure_ctl_tables
 
-def init_project(path: Path, force: bool = False) -> None:
-    """
-    Initialize a new TransmuteDB project with required folder structure
-    and metadata database.
-    
-    Args:
-        path: Path where the project should be created
-        force: If True, overwrite existing files
-        
-    Creates:
-        - pipelines/ directory for pipeline definitions
-        - data/ directory with bronze, silver, gold subdirectories
-        - logs/ directory for pipeline logs
-        - ctl.duckdb metadata database
-    """
-    project_path = path.resolve()
-    
-    # Create main directory if it doesn't exist
-    if not project_path.exists():
-        project_path.mkdir(parents=True, exist_ok=True)
-    
-    # Define folder structure for ETL + Orchestration
-    folders = [
-        "pipelines",           # Pipeline definitions (TOML configs)
-        "data/bronze",         # Raw/staging data
-        "data/silver",         # Cleaned/transformed data
-        "data/gold",           # Aggregated/dimensional models
-        "logs",                # Pipeline execution logs
-        "scripts",             # Custom scripts
-    ]
-    
-    # Folders that should have .gitkeep files to preserve structure
-    gitkeep_folders = ["data/bronze", "data/silver", "data/gold", "logs"]
-    
-    # Create folders
-    for folder in folders:
-        folder_path = project_path / folder
-        if folder_path.exists() and not force:
-            continue
-        folder_path.mkdir(parents=True, exist_ok=True)
-    
-    # Create DuckDB database for metadata
-    db_path = project_path / "ctl.duckdb"
-    
-    # Only create if doesn't exist or force is True
-    if not db_path.exists() or force:
-        con = duckdb.connect(str(db_path))
-        
-        # Use ensure_ctl_tables from the ctl.schema module to create all control tables
-        # Import here to avoid circular dependency
-        from transmutedb.ctl.schema import ensure_ctl_tables
-        ensure_ctl_tables(con)
-        
-        con.close()
-    
-    # Create a sample .gitignore file
-    gitignore_path = project_path / ".gitignore"
-    if not gitignore_path.exists() or force:
-        gitignore_content = """# DuckDB database files
+# Scaffold file contents written by init_project
+_GITIGNORE = """# DuckDB database files
 *.duckdb
 *.duckdb.wal
 
@@ -102,18 +46,8 @@ logs/*
 .DS_Store
 Thumbs.db
 """
-        gitignore_path.write_text(gitignore_content)
-    
-    # Create .gitkeep files in data directories
-    for folder in gitkeep_folders:
-        gitkeep_path = project_path / folder / ".gitkeep"
-        if not gitkeep_path.exists():
-            gitkeep_path.touch()
-    
-    # Create a sample README
-    readme_path = project_path / "README.md"
-    if not readme_path.exists() or force:
-        readme_content = f"""# TransmuteDB Project
+
+_README = """# TransmuteDB Project
 
 This project was initialized with TransmuteDB.
 
@@ -139,7 +73,83 @@ This project was initialized with TransmuteDB.
 
 See the [TransmuteDB documentation](https://github.com/Rawlsy-py/transmutedb) for more information.
 """
-        readme_path.write_text(readme_content)
+
+
+def _write_scaffold_file(path: Path, content: str, force: bool) -> None:
+    """
+    Write a scaffold file, leaving an existing file alone unless forced.
+    
+    Args:
+        path: File to write
+        content: File contents
+        force: If True, overwrite an existing file
+    """
+    # Exclusive create fails on existing files without a separate exists() probe
+    try:
+        with path.open("w" if force else "x") as f:
+            f.write(content)
+    except FileExistsError:
+        pass
+
+
+def init_project(path: Path, force: bool = False) -> None:
+    """
+    Initialize a new TransmuteDB project with required folder structure
+    and metadata database.
+    
+    Args:
+        path: Path where the project should be created
+        force: If True, overwrite existing files
+        
+    Creates:
+        - pipelines/ directory for pipeline definitions
+        - data/ directory with bronze, silver, gold subdirectories
+        - logs/ directory for pipeline logs
+        - ctl.duckdb metadata database
+    """
+    project_path = path.resolve()
+    
+    # Create main directory if it doesn't exist
+    project_path.mkdir(parents=True, exist_ok=True)
+    
+    # Define folder structure for ETL + Orchestration
+    folders = [
+        "pipelines",           # Pipeline definitions (TOML configs)
+        "data/bronze",         # Raw/staging data
+        "data/silver",         # Cleaned/transformed data
+        "data/gold",           # Aggregated/dimensional models
+        "logs",                # Pipeline execution logs
+        "scripts",             # Custom scripts
+    ]
+    
+    # Folders that should have .gitkeep files to preserve structure
+    gitkeep_folders = ["data/bronze", "data/silver", "data/gold", "logs"]
+    
+    # Create folders; exist_ok already covers folders that are present
+    for folder in folders:
+        (project_path / folder).mkdir(parents=True, exist_ok=True)
+    
+    # Create DuckDB database for metadata
+    db_path = project_path / "ctl.duckdb"
+    
+    # Only create if doesn't exist or force is True
+    if not db_path.exists() or force:
+        con = duckdb.connect(str(db_path))
+        
+        # Use ensure_ctl_tables from the ctl.schema module to create all control tables
+        ensure_ctl_tables(con)
+        
+        con.close()
+    
+    # Create a sample .gitignore file
+    _write_scaffold_file(project_path / ".gitignore", _GITIGNORE, force)
+    
+    # Create .gitkeep files in data directories
+    for folder in gitkeep_folders:
+        (project_path / folder / ".gitkeep").touch(exist_ok=True)
+    
+    # Create a sample README
+    _write_scaffold_file(project_path / "README.md", _README, force)
 
 
 def make_entity_wizard(pipeline: str, use_defaults: bool = False) -> None:
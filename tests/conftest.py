@@ -0,0 +1,48 @@
+"""Shared fixtures for TransmuteDB tests."""
+import shutil
+
+import duckdb
+import pytest
+
+from transmutedb.ctl.schema import ensure_ctl_tables
+from transmutedb.scaffold.generate import init_project
+
+
+@pytest.fixture(scope="session")
+def ctl_con():
+    """In-memory database with the control tables, built once per test session."""
+    con = duckdb.connect(":memory:")
+    ensure_ctl_tables(con)
+    yield con
+    con.close()
+
+
+@pytest.fixture
+def isolated_ctl_con(ctl_con):
+    """Cursor on the session database whose changes are rolled back after the test."""
+    cursor = ctl_con.cursor()
+    cursor.begin()
+    yield cursor
+    cursor.rollback()
+    cursor.close()
+
+
+@pytest.fixture(scope="session")
+def init_template(tmp_path_factory):
+    """Project initialized once per test session, to be copied by tests."""
+    template = tmp_path_factory.mktemp("init_template")
+    init_project(template)
+    return template
+
+
+@pytest.fixture
+def initialized_project(init_template, tmp_path):
+    """
+    Private copy of the session's initialized project.
+
+    Files are copied rather than hard-linked so tests can rewrite them in
+    place without touching the template.
+    """
+    project = tmp_path / "project"
+    shutil.copytree(init_template, project)
+    return project
@@ -0,0 +1,15 @@
+"""Assertion helpers shared by TransmuteDB tests."""
+from typing import Any, Optional
+
+
+def assert_table_exists(con: Any, name: str, schema: Optional[str] = None) -> None:
+    """Assert that a table exists, optionally in a given schema."""
+    row = con.execute(
+        """
+        SELECT 1 FROM duckdb_tables()
+        WHERE table_name = ? AND (? IS NULL OR schema_name = ?)
+        LIMIT 1
+        """,
+        [name, schema, schema],
+    ).fetchone()
+    assert row is not None, f"table {schema + '.' if schema else ''}{name} does not exist"
@@ -0,0 +1,158 @@
+"""Tests for CLI helpers."""
+import math
+import subprocess
+import sys
+
+import duckdb
+import pytest
+import typer
+from typer.testing import CliRunner
+
+from transmutedb.cli import _parse_kv, app, logs_tail
+from transmutedb.ctl.schema import ensure_ctl_tables
+
+runner = CliRunner()
+
+
+def test_parse_kv_casts_values():
+    """Test that --set values are cast to bool, int, float or left as str."""
+    result = _parse_kv([
+        "flag=true",
+        "off=FALSE",
+        "count=42",
+        "offset=-3",
+        "ratio=2.5",
+        "tiny=1e-3",
+        "name=orders",
+        "version=1.2.3",
+    ])
+
+    assert result == {
+        "flag": True,
+        "off": False,
+        "count": 42,
+        "offset": -3,
+        "ratio": 2.5,
+        "tiny": 0.001,
+        "name": "orders",
+        "version": "1.2.3",
+    }
+    assert isinstance(result["count"], int)
+
+
+def test_parse_kv_casts_python_numeric_literals():
+    """Test that values accepted by int() and float() are cast like the builtins."""
+    result = _parse_kv(["rows=1_000", "missing=nan", "limit=inf", "floor=-inf"])
+
+    assert result["rows"] == 1000
+    assert isinstance(result["rows"], int)
+    assert math.isnan(result["missing"])
+    assert result["limit"] == math.inf
+    assert result["floor"] == -math.inf
+
+
+def test_parse_kv_splits_on_first_equals():
+    """Test that only the first '=' separates key and value."""
+    assert _parse_kv(["filter=a=b"]) == {"filter": "a=b"}
+
+
+def test_parse_kv_rejects_missing_equals():
+    """Test that a pair without '=' raises a BadParameter."""
+    with pytest.raises(typer.BadParameter):
+        _parse_kv(["novalue"])
+
+
+def test_logs_tail_filters_by_pipeline(tmp_path, capsys):
+    """Test that logs tail only shows runs for the requested pipeline."""
+    db_path = tmp_path / "dw.duckdb"
+    con = duckdb.connect(str(db_path))
+    ensure_ctl_tables(con)
+    con.execute(
+        """
+        INSERT INTO run_log
+            (run_id, pipeline, step, entity, started_at, status, rows_in, rows_out)
+        VALUES
+            (1, 'sales', 'stg', 'orders', TIMESTAMP '2024-01-01 10:00:00', 'ok', 10, 10),
+            (2, 'hr', 'dim', NULL, TIMESTAMP '2024-01-01 11:00:00', 'ok', 5, 5),
+            (3, 'sales', 'fact', NULL, TIMESTAMP '2024-01-01 12:00:00', 'failed', 10, 0)
+        """
+    )
+    con.close()
+
+    # Call the command function directly; CLI wiring is covered by the
+    # runner-based logs tail test below
+    warehouse = f"duckdb://file:{db_path}"
+    logs_tail(pipeline="sales", limit=50, warehouse_uri=warehouse)
+
+    out = capsys.readouterr().out
+    lines = out.strip().splitlines()
+    assert len(lines) == 2
+    assert lines[0].startswith("[2024-01-01 12:00:00] sales.fact")
+    assert "(orders)" in lines[1]
+    assert "hr." not in out
+
+    # A quote in the filter is bound as a value, not spliced into SQL
+    logs_tail(pipeline="x' OR '1'='1", limit=50, warehouse_uri=warehouse)
+    assert capsys.readouterr().out == ""
+
+
+def test_schedule_add_and_export(tmp_path):
+    """Test that added schedules are exported as crontab lines."""
+    project_dir = tmp_path
+    for pipeline, cron in [("sales", "0 * * * *"), ("hr", "30 2 * * *")]:
+        result = runner.invoke(
+            app,
+            ["schedule", "add", pipeline, "--cron", cron, "--project-dir", str(project_dir)],
+        )
+        assert result.exit_code == 0
+
+    result = runner.invoke(
+        app, ["schedule", "export", "--project-dir", str(project_dir), "--log", "cron.log"]
+    )
+
+    assert result.exit_code == 0
+    lines = result.stdout.splitlines()
+    assert lines[0] == "# Add the following lines to your crontab:"
+    assert lines[1:] == [
+        f"0 * * * * cd {project_dir.resolve()} && transmutedb run sales "
+        "--env dev --step all >> cron.log 2>&1",
+        f"30 2 * * * cd {project_dir.resolve()} && transmutedb run hr "
+        "--env dev --step all >> cron.log 2>&1",
+    ]
+
+
+def test_logs_tail_without_warehouse(tmp_path):
+    """Test that logs tail reports no logs when the warehouse doesn't exist yet."""
+    db_path = tmp_path / "missing.duckdb"
+    result = runner.invoke(app, ["logs", "tail", "--warehouse", f"duckdb://file:{db_path}"])
+
+    assert result.exit_code == 0
+    assert "no run logs found" in result.stdout
+    assert not db_path.exists()
+
+
+def test_logs_tail_reports_locked_warehouse(tmp_path):
+    """Test that logs tail fails clearly while another process writes the warehouse."""
+    db_path = tmp_path / "dw.duckdb"
+    writer = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys, duckdb; con = duckdb.connect(sys.argv[1]); "
+            "print('ready', flush=True); sys.stdin.read()",
+            str(db_path),
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert writer.stdout.readline().strip() == "ready"
+        result = runner.invoke(app, ["logs", "tail", "--warehouse", f"duckdb://file:{db_path}"])
+    finally:
+        writer.stdin.close()
+        writer.wait(timeout=30)
+
+    assert result.exit_code == 1
+    assert "locked or unreadable" in result.stdout
+    assert "no run logs found" not in result.stdout
@@ -0,0 +1,54 @@
+"""Tests for pipeline configuration loading."""
+import os
+
+import pytest
+
+from transmutedb.config.loader import load_pipeline_config
+
+
+def test_load_pipeline_config_parses_toml(tmp_path):
+    """Test that a pipeline TOML is parsed into a PipelineConfig."""
+    config_path = tmp_path / "pipeline.toml"
+    config_path.write_text('name = "sales"\nversion = "1.0.0"\n')
+
+    cfg = load_pipeline_config(config_path)
+
+    assert cfg.name == "sales"
+    assert cfg.version == "1.0.0"
+
+
+def test_load_pipeline_config_is_cached_until_file_changes(tmp_path):
+    """Test that unchanged files reuse the cached config and edits are picked up."""
+    config_path = tmp_path / "pipeline.toml"
+    config_path.write_text('name = "sales"\n')
+
+    first = load_pipeline_config(config_path)
+    assert load_pipeline_config(config_path) is first
+
+    config_path.write_text('name = "finance"\n')
+    stat = config_path.stat()
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert load_pipeline_config(config_path).name == "finance"
+
+
+def test_load_pipeline_config_reloads_edit_with_same_mtime(tmp_path):
+    """Test that an edit within one filesystem timestamp tick is still picked up."""
+    config_path = tmp_path / "pipeline.toml"
+    config_path.write_text('name = "sales"\n')
+    stat = config_path.stat()
+    assert load_pipeline_config(config_path).name == "sales"
+
+    # Coarse timestamps leave the modification time unchanged after a quick edit
+    config_path.write_text('name = "finance"\nversion = "2.0.0"\n')
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    cfg = load_pipeline_config(config_path)
+    assert cfg.name == "finance"
+    assert cfg.version == "2.0.0"
+
+
+def test_load_pipeline_config_missing_file(tmp_path):
+    """Test that a missing config file raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        load_pipeline_config(tmp_path / "missing.toml")
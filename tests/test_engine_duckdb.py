@@ -0,0 +1,66 @@
+"""Tests for the DuckDB engine helpers."""
+import duckdb
+import pytest
+
+from transmutedb.engine.duckdb import connect, fetch_df
+
+
+def test_connect_parses_uri_forms(tmp_path):
+    """Test that file:, bare and plain-path URIs all open the same database."""
+    db_path = tmp_path / "dw.duckdb"
+
+    con = connect(f"duckdb://file:{db_path}")
+    con.execute("CREATE TABLE t AS SELECT 1 AS x")
+    con.close()
+
+    for uri in (f"duckdb://{db_path}", str(db_path)):
+        con = connect(uri)
+        assert con.execute("SELECT x FROM t").fetchone() == (1,)
+        con.close()
+
+    assert db_path.exists()
+
+
+def test_fetch_df_formats():
+    """Test that fetch_df returns Polars, Arrow batches or plain rows."""
+    con = connect("duckdb://:memory:")
+    query = "SELECT range AS n FROM range(5) WHERE range >= ? ORDER BY n"
+
+    df = fetch_df(con, query, [3])
+    assert df["n"].to_list() == [3, 4]
+
+    reader = fetch_df(con, query, [3], format="arrow")
+    assert reader.read_all().column("n").to_pylist() == [3, 4]
+
+    assert fetch_df(con, query, [3], format="rows") == [(3,), (4,)]
+
+    with pytest.raises(ValueError):
+        fetch_df(con, query, [3], format="pandas")
+    con.close()
+
+
+def test_connect_applies_config():
+    """Test that connect keeps DuckDB's defaults and applies caller settings."""
+    con = connect("duckdb://:memory:")
+    assert con.execute("SELECT current_setting('preserve_insertion_order')").fetchone() == (True,)
+    con.close()
+
+    con = connect(
+        "duckdb://:memory:", config={"threads": 2, "preserve_insertion_order": False}
+    )
+    assert con.execute(
+        "SELECT current_setting('preserve_insertion_order'), current_setting('threads')"
+    ).fetchone() == (False, 2)
+    con.close()
+
+
+def test_connect_shares_file_opened_with_plain_duckdb(tmp_path):
+    """Test that connect works on a file this process already opened with duckdb.connect."""
+    db_path = tmp_path / "dw.duckdb"
+    plain = duckdb.connect(str(db_path))
+    plain.execute("CREATE TABLE t AS SELECT 1 AS x")
+
+    con = connect(f"duckdb://file:{db_path}")
+    assert con.execute("SELECT x FROM t").fetchone() == (1,)
+    con.close()
+    plain.close()
@@ -1,67 +1,366 @@
 """Tests for entity metadata functionality."""
-import tempfile
-from pathlib import Path
-
 import duckdb
+import polars as pl
 import pytest
 
+from tests.helpers import assert_table_exists
 from transmutedb.ctl.schema import ensure_ctl_tables
+from transmutedb.flow.entity_builder import (
+    _fetch_column_meta,
+    _get_entity_id,
+    _is_valid_data_type,
+    _validate_identifier,
+    add_entity_column,
+    add_entity_columns,
+    build_gold_entity,
+    ensure_schemas,
+    load_bronze_entity,
+    process_silver_entity,
+    update_entity_metadata,
+)
 from transmutedb.scaffold.generate import init_project
 
+# Expected columns of every control table created by ensure_ctl_tables
+EXPECTED_CTL_SCHEMA = {
+    "run_log": [
+        "run_id", "pipeline", "step", "entity", "started_at", "completed_at",
+        "status", "rows_in", "rows_out", "error_message",
+    ],
+    "dq_results": [
+        "dq_id", "run_id", "pipeline", "entity", "check_name", "check_type",
+        "passed", "rows_checked", "rows_failed", "created_at",
+    ],
+    "entity_metadata": [
+        "entity_id", "entity_name", "source_table", "target_schema", "entity_type",
+        "description", "created_at", "updated_at",
+    ],
+    "entity_column_metadata": [
+        "column_id", "entity_id", "column_name", "data_type", "is_nullable",
+        "is_measure", "is_dimension", "is_business_key", "track_history",
+        "default_value", "description", "dq_rule_type", "dq_rule_params",
+        "created_at", "updated_at",
+    ],
+    "ctl_version": ["version"],
+}
+
+
+@pytest.mark.parametrize("table,columns", EXPECTED_CTL_SCHEMA.items())
+def test_ctl_schema(ctl_con, table, columns):
+    """Test that ensure_ctl_tables creates each control table with its columns."""
+    schema = ctl_con.execute(f"DESCRIBE {table}").fetchall()
+    assert [col[0] for col in schema] == columns
 
-def test_ensure_ctl_tables_creates_entity_metadata_tables():
-    """Test that ensure_ctl_tables creates entity metadata tables."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.duckdb"
-        con = duckdb.connect(str(db_path))
-        
-        ensure_ctl_tables(con)
-        
-        # Verify entity_metadata table exists
-        tables = con.execute("SHOW TABLES").fetchall()
-        table_names = [t[0] for t in tables]
-        
-        assert "entity_metadata" in table_names
-        assert "entity_column_metadata" in table_names
-        
-        # Verify entity_metadata schema
-        schema = con.execute("DESCRIBE entity_metadata").fetchall()
-        column_names = [col[0] for col in schema]
-        assert "entity_id" in column_names
-        assert "entity_name" in column_names
-        assert "source_table" in column_names
-        assert "target_schema" in column_names
-        
-        # Verify entity_column_metadata schema
-        schema = con.execute("DESCRIBE entity_column_metadata").fetchall()
-        column_names = [col[0] for col in schema]
-        assert "column_id" in column_names
-        assert "entity_id" in column_names
-        assert "column_name" in column_names
-        assert "data_type" in column_names
-        assert "is_measure" in column_names
-        assert "is_dimension" in column_names
-        assert "dq_rule_type" in column_names
-        
-        con.close()
-
-
-def test_init_project_creates_entity_metadata():
+
+def test_init_project_creates_entity_metadata(tmp_path):
     """Test that init_project creates entity metadata tables."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        project_path = Path(tmpdir) / "test_project"
-        init_project(project_path)
-        
-        db_path = project_path / "ctl.duckdb"
-        assert db_path.exists()
-        
-        con = duckdb.connect(str(db_path))
-        
-        # Verify entity tables exist
-        tables = con.execute("SHOW TABLES").fetchall()
-        table_names = [t[0] for t in tables]
-        
-        assert "entity_metadata" in table_names
-        assert "entity_column_metadata" in table_names
-        
-        con.close()
+    project_path = tmp_path / "test_project"
+    init_project(project_path)
+    
+    db_path = project_path / "ctl.duckdb"
+    assert db_path.exists()
+    
+    con = duckdb.connect(str(db_path))
+    
+    # Verify entity tables exist
+    assert_table_exists(con, "entity_metadata")
+    assert_table_exists(con, "entity_column_metadata")
+    
+    con.close()
+
+
+def test_ensure_ctl_tables_is_idempotent():
+    """Test that repeated ensure_ctl_tables calls keep existing metadata."""
+    con = duckdb.connect(":memory:")
+    ensure_ctl_tables(con)
+    con.execute(
+        "INSERT INTO entity_metadata (entity_id, entity_name) "
+        "VALUES (nextval('entity_metadata_seq'), 'orders')"
+    )
+
+    ensure_ctl_tables(con)
+    # A fresh connection object finds the current ctl_version and skips the DDL
+    ensure_ctl_tables(con.cursor())
+
+    assert con.execute("SELECT COUNT(*) FROM entity_metadata").fetchone()[0] == 1
+    con.close()
+
+
+def test_ensure_ctl_tables_recreates_tables_after_rollback():
+    """Test that control tables rolled back with a transaction are created again."""
+    con = duckdb.connect(":memory:")
+
+    con.begin()
+    ensure_ctl_tables(con)
+    con.rollback()
+
+    ensure_ctl_tables(con)
+    assert_table_exists(con, "entity_metadata")
+    con.close()
+
+
+def test_ensure_ctl_tables_reruns_ddl_for_old_version(tmp_path):
+    """Test that a database with an outdated ctl_version gets the DDL again."""
+    db_path = str(tmp_path / "ctl.duckdb")
+    con = duckdb.connect(db_path)
+    ensure_ctl_tables(con)
+    con.execute("DROP VIEW entity_column_metadata_packed")
+    con.close()
+
+    # Current version: a new connection trusts the recorded schema
+    con = duckdb.connect(db_path)
+    ensure_ctl_tables(con)
+    assert con.execute(
+        "SELECT COUNT(*) FROM duckdb_views() WHERE view_name = 'entity_column_metadata_packed'"
+    ).fetchone()[0] == 0
+    con.execute("UPDATE ctl_version SET version = 0")
+    con.close()
+
+    # Outdated version: the DDL runs and restores the missing view
+    con = duckdb.connect(db_path)
+    ensure_ctl_tables(con)
+    assert con.execute(
+        "SELECT COUNT(*) FROM duckdb_views() WHERE view_name = 'entity_column_metadata_packed'"
+    ).fetchone()[0] == 1
+    con.close()
+
+
+def test_ensure_ctl_tables_replaces_outdated_packed_view():
+    """Test that an outdated ctl_version redefines an existing packed view."""
+    con = duckdb.connect(":memory:")
+    ensure_ctl_tables(con)
+    con.execute(
+        "CREATE OR REPLACE VIEW entity_column_metadata_packed AS SELECT 1 AS entity_id"
+    )
+    con.execute("UPDATE ctl_version SET version = 0")
+
+    ensure_ctl_tables(con)
+
+    columns = [
+        d[0] for d in con.execute("SELECT * FROM entity_column_metadata_packed").description
+    ]
+    assert columns[:2] == ["entity_id", "column_names"]
+    con.close()
+
+
+def test_tier_builds_work_without_packed_view(isolated_ctl_con):
+    """Test that control databases created before the packed view still build."""
+    con = isolated_ctl_con
+    con.execute("DROP VIEW entity_column_metadata_packed")
+    update_entity_metadata(con, "orders")
+    add_entity_columns(con, "orders", [
+        {"column_name": "order_id", "data_type": "INTEGER", "is_dimension": True},
+        {"column_name": "amount", "data_type": "DOUBLE", "is_measure": True},
+    ])
+
+    load_bronze_entity(con, "orders", pl.DataFrame({"order_id": [1, 2], "amount": [1.5, 2.0]}))
+    assert process_silver_entity(con, "orders")["valid_rows"] == 2
+    result = build_gold_entity(con, "orders")
+
+    assert result["total_rows"] == 2
+    assert result["measures"] == ["amount"]
+
+
+def test_entity_column_metadata_packed_view(isolated_ctl_con):
+    """Test that the packed view returns one row of parallel arrays per entity."""
+    con = isolated_ctl_con
+
+    entity_id = update_entity_metadata(con, "orders")
+    add_entity_column(con, "orders", "order_id", "INTEGER", is_nullable=False, is_business_key=True)
+    add_entity_column(con, "orders", "amount", "DECIMAL(10,2)", is_measure=True)
+
+    row = con.execute(
+        """
+        SELECT column_names, data_types, is_nullable, is_measure, is_business_key
+        FROM entity_column_metadata_packed
+        WHERE entity_id = ?
+        """,
+        [entity_id],
+    ).fetchall()
+
+    assert row == [(
+        ["order_id", "amount"],
+        ["INTEGER", "DECIMAL(10,2)"],
+        [False, True],
+        [False, True],
+        [True, False],
+    )]
+
+
+def test_update_entity_metadata_upserts(isolated_ctl_con):
+    """Test that update_entity_metadata keeps the entity_id when updating an entity."""
+    con = isolated_ctl_con
+
+    orders_id = update_entity_metadata(con, "orders", source_table="raw.orders")
+    customers_id = update_entity_metadata(con, "customers")
+    assert update_entity_metadata(con, "orders", entity_type="dimension") == orders_id
+    assert customers_id != orders_id
+
+    row = con.execute(
+        "SELECT source_table, entity_type FROM entity_metadata WHERE entity_id = ?",
+        [orders_id],
+    ).fetchone()
+    assert row == ("", "dimension")
+    assert con.execute("SELECT COUNT(*) FROM entity_metadata").fetchone()[0] == 2
+
+
+def test_update_entity_metadata_updates_entity_with_columns(isolated_ctl_con):
+    """Test that re-upserting an entity with registered columns keeps it and its columns."""
+    con = isolated_ctl_con
+
+    orders_id = update_entity_metadata(con, "orders")
+    add_entity_column(con, "orders", "order_id", "INTEGER")
+
+    assert update_entity_metadata(con, "orders", description="Orders fact") == orders_id
+    add_entity_column(con, "orders", "amount", "DOUBLE")
+
+    assert con.execute(
+        "SELECT description FROM entity_metadata WHERE entity_id = ?", [orders_id]
+    ).fetchone() == ("Orders fact",)
+    fields = ("column_names",)
+    assert _fetch_column_meta(con, orders_id, fields) == [("order_id",), ("amount",)]
+
+
+def test_add_entity_columns_registers_batch(isolated_ctl_con):
+    """Test that add_entity_columns inserts all columns and returns their ids in order."""
+    con = isolated_ctl_con
+
+    entity_id = update_entity_metadata(con, "orders")
+    first_id = add_entity_column(con, "orders", "order_id", "INTEGER", is_business_key=True)
+    column_ids = add_entity_columns(con, "orders", [
+        {"column_name": "amount", "data_type": "DECIMAL(10,2)", "is_measure": True},
+        {"column_name": "status", "data_type": "VARCHAR", "is_nullable": False},
+    ])
+
+    assert column_ids == [first_id + 1, first_id + 2]
+    row = con.execute(
+        """
+        SELECT column_names, is_nullable, is_measure
+        FROM entity_column_metadata_packed
+        WHERE entity_id = ?
+        """,
+        [entity_id],
+    ).fetchone()
+    assert row == (["order_id", "amount", "status"], [True, True, False], [False, True, False])
+
+    with pytest.raises(ValueError):
+        add_entity_columns(con, "missing", [{"column_name": "x", "data_type": "INTEGER"}])
+
+
+def test_fetch_column_meta_sees_new_columns(isolated_ctl_con):
+    """Test that column metadata reflects columns added after an earlier fetch."""
+    con = isolated_ctl_con
+    entity_id = update_entity_metadata(con, "orders")
+    add_entity_column(con, "orders", "order_id", "INTEGER")
+
+    fields = ("column_names", "data_types")
+    assert _fetch_column_meta(con, entity_id, fields) == [("order_id", "INTEGER")]
+
+    add_entity_columns(con, "orders", [{"column_name": "amount", "data_type": "DOUBLE"}])
+    assert _fetch_column_meta(con, entity_id, fields) == [
+        ("order_id", "INTEGER"),
+        ("amount", "DOUBLE"),
+    ]
+
+
+def test_get_entity_id_reads_current_metadata(isolated_ctl_con):
+    """Test that entity id lookups reflect renames made after an earlier lookup."""
+    con = isolated_ctl_con
+    orders_id = update_entity_metadata(con, "orders")
+
+    with pytest.raises(ValueError):
+        _get_entity_id(con, "customers")
+
+    assert _get_entity_id(con, "orders") == orders_id
+    con.execute("UPDATE entity_metadata SET entity_name = 'renamed'")
+    assert _get_entity_id(con, "renamed") == orders_id
+    with pytest.raises(ValueError):
+        _get_entity_id(con, "orders")
+
+
+def test_ensure_schemas_creates_each_schema_once():
+    """Test that ensure_schemas creates all requested schemas and validates names."""
+    con = duckdb.connect(":memory:")
+
+    ensure_schemas(con, "bronze", "silver", "bronze")
+    ensure_schemas(con, "silver", "gold")
+
+    schemas = {
+        r[0] for r in con.execute("SELECT schema_name FROM information_schema.schemata").fetchall()
+    }
+    assert {"bronze", "silver", "gold"} <= schemas
+
+    with pytest.raises(ValueError):
+        ensure_schemas(con, "gold; DROP TABLE x")
+    con.close()
+
+
+def test_ensure_schemas_recreates_schemas_after_rollback():
+    """Test that schemas rolled back with a transaction are created again."""
+    con = duckdb.connect(":memory:")
+
+    con.begin()
+    ensure_schemas(con, "bronze")
+    con.rollback()
+
+    load_bronze_entity(con, "orders", pl.DataFrame({"order_id": [1]}))
+    assert_table_exists(con, "orders_bronze", schema="bronze")
+    con.close()
+
+
+def test_build_gold_fact_reports_stats(isolated_ctl_con):
+    """Test that a gold fact build reports its row count and load window."""
+    con = isolated_ctl_con
+    update_entity_metadata(con, "orders")
+    add_entity_columns(con, "orders", [
+        {"column_name": "order_id", "data_type": "INTEGER", "is_dimension": True},
+        {"column_name": "amount", "data_type": "DOUBLE", "is_measure": True},
+    ])
+
+    load_bronze_entity(con, "orders", pl.DataFrame({
+        "order_id": [1, 2, 3], "amount": [1.5, 2.0, 4.25],
+    }))
+    process_silver_entity(con, "orders")
+    result = build_gold_entity(con, "orders")
+
+    assert result["total_rows"] == 3
+    assert result["measures"] == ["amount"]
+    assert result["dimensions"] == ["order_id"]
+    assert result["earliest_record"] is not None
+    assert result["earliest_record"] <= result["latest_record"]
+
+
+def test_validate_identifier_rejects_unsafe_names():
+    """Test that identifiers must be plain SQL names."""
+    assert _validate_identifier("customer_2") == "customer_2"
+
+    for bad in ("2customer", "customer;drop", "customer\n", "cust omer", "a" * 64):
+        with pytest.raises(ValueError):
+            _validate_identifier(bad, "entity name")
+
+
+def test_is_valid_data_type():
+    """Test that only plain SQL type names pass the data type check."""
+    for ok in ("INTEGER", "varchar", "DECIMAL(10,2)", " DOUBLE "):
+        assert _is_valid_data_type(ok)
+
+    for bad in ("INT; DROP TABLE x", "VARCHAR)", "DECIMAL(a)", "MAP(VARCHAR, INT)"):
+        assert not _is_valid_data_type(bad)
+
+
+def test_process_silver_entity_rejects_nulls_in_not_null_columns(isolated_ctl_con):
+    """Test that a NOT NULL violation raises before the silver table is replaced."""
+    con = isolated_ctl_con
+    update_entity_metadata(con, "orders")
+    add_entity_column(con, "orders", "order_id", "INTEGER", is_nullable=False)
+
+    load_bronze_entity(con, "orders", pl.DataFrame({"order_id": ["1", "2"]}))
+    process_silver_entity(con, "orders")
+
+    # "x" fails the INTEGER cast, so order_id would be NULL
+    load_bronze_entity(con, "orders", pl.DataFrame({"order_id": ["x", "3"]}))
+    with pytest.raises(ValueError, match="order_id"):
+        process_silver_entity(con, "orders")
+
+    assert con.execute(
+        "SELECT order_id FROM silver.orders_silver ORDER BY order_id"
+    ).fetchall() == [(1,), (2,)]
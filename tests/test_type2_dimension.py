@@ -1,16 +1,13 @@
 """Tests for Type 2 Slowly Changing Dimension functionality."""
-import tempfile
+import hashlib
 from datetime import datetime
-from pathlib import Path
 
-import duckdb
-import pandas as pd
 import polars as pl
 import pytest
 
-from transmutedb.ctl.schema import ensure_ctl_tables
+from transmutedb.engine.duckdb import connect
 from transmutedb.flow.entity_builder import (
-    add_entity_column,
+    add_entity_columns,
     build_gold_entity,
     load_bronze_entity,
     process_silver_entity,
@@ -18,395 +15,563 @@ from transmutedb.flow.entity_builder import (
 )
 
 
-def test_type2_dimension_initial_load():
+def test_type2_dimension_initial_load(isolated_ctl_con):
     """Test initial load of a Type 2 dimension."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.duckdb"
-        con = duckdb.connect(str(db_path))
-        
-        ensure_ctl_tables(con)
-        
-        # Create entity metadata for a customer dimension
-        entity_id = update_entity_metadata(
-            con,
-            entity_name="customer",
-            source_table="source_customers",
-            target_schema="gold",
-            entity_type="type2_dimension",
-            description="Customer dimension with Type 2 SCD"
-        )
-        
-        # Add columns with business key and tracked attributes
-        add_entity_column(con, "customer", "customer_id", "INTEGER", is_nullable=False, is_business_key=True)
-        add_entity_column(con, "customer", "customer_name", "VARCHAR", is_nullable=False, track_history=True)
-        add_entity_column(con, "customer", "email", "VARCHAR", is_nullable=False, track_history=True)
-        add_entity_column(con, "customer", "city", "VARCHAR", is_nullable=True, track_history=True)
-        
-        # Create sample source data
-        source_data = pl.DataFrame({
-            "customer_id": [1, 2, 3],
-            "customer_name": ["Alice", "Bob", "Charlie"],
-            "email": ["alice@example.com", "bob@example.com", "charlie@example.com"],
-            "city": ["New York", "Los Angeles", "Chicago"]
-        })
-        
-        # Load through bronze, silver, and gold tiers
-        load_bronze_entity(con, "customer", source_data)
-        process_silver_entity(con, "customer")
-        result = build_gold_entity(con, "customer")
-        
-        # Verify results
-        assert result["entity_type"] == "type2_dimension"
-        assert result["total_rows"] == 3
-        assert result["new_rows"] == 3
-        assert result["updated_rows"] == 0
-        assert "customer_id" in result["business_keys"]
-        
-        # Verify dimension table structure
-        gold_data = con.execute("SELECT * FROM gold.customer").fetchdf()
-        assert len(gold_data) == 3
-        assert "customer_key" in gold_data.columns
-        assert "_valid_from" in gold_data.columns
-        assert "_valid_to" in gold_data.columns
-        assert "_is_current" in gold_data.columns
-        
-        # All records should be current
-        assert gold_data["_is_current"].all()
-        assert gold_data["_valid_to"].isna().all()
-        
-        con.close()
-
-
-def test_type2_dimension_update_with_changes():
+    con = isolated_ctl_con
+    
+    # Create entity metadata for a customer dimension
+    entity_id = update_entity_metadata(
+        con,
+        entity_name="customer",
+        source_table="source_customers",
+        target_schema="gold",
+        entity_type="type2_dimension",
+        description="Customer dimension with Type 2 SCD"
+    )
+    
+    # Add columns with business key and tracked attributes
+    add_entity_columns(con, "customer", [
+        {
+            "column_name": "customer_id", "data_type": "INTEGER",
+            "is_nullable": False, "is_business_key": True,
+        },
+        {
+            "column_name": "customer_name", "data_type": "VARCHAR",
+            "is_nullable": False, "track_history": True,
+        },
+        {
+            "column_name": "email", "data_type": "VARCHAR",
+            "is_nullable": False, "track_history": True,
+        },
+        {
+            "column_name": "city", "data_type": "VARCHAR",
+            "is_nullable": True, "track_history": True,
+        },
+    ])
+    
+    # Create sample source data
+    source_data = pl.DataFrame({
+        "customer_id": [1, 2, 3],
+        "customer_name": ["Alice", "Bob", "Charlie"],
+        "email": ["alice@example.com", "bob@example.com", "charlie@example.com"],
+        "city": ["New York", "Los Angeles", "Chicago"]
+    })
+    
+    # Load through bronze, silver, and gold tiers
+    load_bronze_entity(con, "customer", source_data)
+    process_silver_entity(con, "customer")
+    result = build_gold_entity(con, "customer")
+    
+    # Verify results
+    assert result["entity_type"] == "type2_dimension"
+    assert result["total_rows"] == 3
+    assert result["new_rows"] == 3
+    assert result["updated_rows"] == 0
+    assert "customer_id" in result["business_keys"]
+    
+    # Verify dimension table structure
+    gold_columns = [row[0] for row in con.execute("DESCRIBE gold.customer").fetchall()]
+    assert "customer_key" in gold_columns
+    assert "_valid_from" in gold_columns
+    assert "_valid_to" in gold_columns
+    assert "_is_current" in gold_columns
+    
+    # All records should be current
+    assert con.execute(
+        "SELECT COUNT(*), bool_and(_is_current AND _valid_to IS NULL) FROM gold.customer"
+    ).fetchone() == (3, True)
+
+
+def test_type2_dimension_update_with_changes(isolated_ctl_con):
     """Test Type 2 dimension update with changed records."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.duckdb"
-        con = duckdb.connect(str(db_path))
-        
-        ensure_ctl_tables(con)
-        
-        # Setup entity
-        update_entity_metadata(
-            con,
-            entity_name="customer",
-            entity_type="type2_dimension"
-        )
-        
-        add_entity_column(con, "customer", "customer_id", "INTEGER", is_nullable=False, is_business_key=True)
-        add_entity_column(con, "customer", "customer_name", "VARCHAR", is_nullable=False, track_history=True)
-        add_entity_column(con, "customer", "email", "VARCHAR", is_nullable=False, track_history=True)
-        
-        # Initial load
-        initial_data = pl.DataFrame({
-            "customer_id": [1, 2],
-            "customer_name": ["Alice", "Bob"],
-            "email": ["alice@example.com", "bob@example.com"]
-        })
-        
-        load_bronze_entity(con, "customer", initial_data)
-        process_silver_entity(con, "customer")
-        build_gold_entity(con, "customer")
-        
-        # Update with changes - Alice changes email
-        updated_data = pl.DataFrame({
-            "customer_id": [1, 2],
-            "customer_name": ["Alice", "Bob"],
-            "email": ["alice.new@example.com", "bob@example.com"]  # Alice's email changed
-        })
-        
-        load_bronze_entity(con, "customer", updated_data)
-        process_silver_entity(con, "customer")
-        result = build_gold_entity(con, "customer")
-        
-        # Verify Type 2 behavior
-        gold_data = con.execute("""
-            SELECT customer_id, customer_name, email, _is_current, _valid_to 
-            FROM gold.customer 
-            ORDER BY customer_id, _valid_from
-        """).fetchdf()
-        
-        # Should have 3 records: 2 for Alice (old and new), 1 for Bob
-        assert len(gold_data) == 3
-        
-        # Check Alice's records
-        alice_records = gold_data[gold_data["customer_id"] == 1]
-        assert len(alice_records) == 2
-        
-        # Old record should be closed
-        old_alice = alice_records[alice_records["email"] == "alice@example.com"].iloc[0]
-        assert not old_alice["_is_current"]
-        assert old_alice["_valid_to"] is not None and not pd.isna(old_alice["_valid_to"])
-        
-        # New record should be current
-        new_alice = alice_records[alice_records["email"] == "alice.new@example.com"].iloc[0]
-        assert new_alice["_is_current"]
-        assert pd.isna(new_alice["_valid_to"])  # Use pd.isna for NULL timestamp
-        
-        # Bob should have only one current record
-        bob_records = gold_data[gold_data["customer_id"] == 2]
-        assert len(bob_records) == 1
-        assert bob_records.iloc[0]["_is_current"]
-        
-        con.close()
-
-
-def test_type2_dimension_new_records():
-    """Test Type 2 dimension with new records added."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.duckdb"
-        con = duckdb.connect(str(db_path))
-        
-        ensure_ctl_tables(con)
-        
-        # Setup entity
-        update_entity_metadata(
-            con,
-            entity_name="customer",
-            entity_type="type2_dimension"
-        )
-        
-        add_entity_column(con, "customer", "customer_id", "INTEGER", is_nullable=False, is_business_key=True)
-        add_entity_column(con, "customer", "customer_name", "VARCHAR", is_nullable=False, track_history=True)
-        
-        # Initial load
-        initial_data = pl.DataFrame({
-            "customer_id": [1, 2],
-            "customer_name": ["Alice", "Bob"]
-        })
-        
-        load_bronze_entity(con, "customer", initial_data)
-        process_silver_entity(con, "customer")
-        build_gold_entity(con, "customer")
-        
-        # Add new customer
-        new_data = pl.DataFrame({
-            "customer_id": [1, 2, 3],  # Added customer 3
-            "customer_name": ["Alice", "Bob", "Charlie"]
-        })
-        
-        load_bronze_entity(con, "customer", new_data)
-        process_silver_entity(con, "customer")
-        result = build_gold_entity(con, "customer")
-        
-        # Verify new record was added
-        gold_data = con.execute("""
-            SELECT customer_id, customer_name, _is_current 
-            FROM gold.customer 
-            ORDER BY customer_id
-        """).fetchdf()
-        
-        assert len(gold_data) == 3
-        assert gold_data["_is_current"].all()
-        assert 3 in gold_data["customer_id"].values
-        
-        con.close()
-
-
-def test_type2_dimension_no_changes():
-    """Test Type 2 dimension with no changes (idempotent)."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.duckdb"
-        con = duckdb.connect(str(db_path))
-        
-        ensure_ctl_tables(con)
-        
-        # Setup entity
-        update_entity_metadata(
-            con,
-            entity_name="customer",
-            entity_type="type2_dimension"
-        )
-        
-        add_entity_column(con, "customer", "customer_id", "INTEGER", is_nullable=False, is_business_key=True)
-        add_entity_column(con, "customer", "customer_name", "VARCHAR", is_nullable=False, track_history=True)
-        
-        # Initial load
-        data = pl.DataFrame({
-            "customer_id": [1, 2],
-            "customer_name": ["Alice", "Bob"]
-        })
-        
-        load_bronze_entity(con, "customer", data)
-        process_silver_entity(con, "customer")
-        build_gold_entity(con, "customer")
-        
-        # Reload same data
-        load_bronze_entity(con, "customer", data)
-        process_silver_entity(con, "customer")
-        result = build_gold_entity(con, "customer")
-        
-        # Should still have only 2 records, all current
-        gold_data = con.execute("SELECT * FROM gold.customer").fetchdf()
-        assert len(gold_data) == 2
-        assert gold_data["_is_current"].all()
-        assert gold_data["_valid_to"].isna().all()
-        
-        con.close()
-
-
-def test_type2_dimension_requires_business_key():
+    con = isolated_ctl_con
+    
+    # Setup entity
+    update_entity_metadata(
+        con,
+        entity_name="customer",
+        entity_type="type2_dimension"
+    )
+    
+    add_entity_columns(con, "customer", [
+        {
+            "column_name": "customer_id", "data_type": "INTEGER",
+            "is_nullable": False, "is_business_key": True,
+        },
+        {
+            "column_name": "customer_name", "data_type": "VARCHAR",
+            "is_nullable": False, "track_history": True,
+        },
+        {
+            "column_name": "email", "data_type": "VARCHAR",
+            "is_nullable": False, "track_history": True,
+        },
+    ])
+    
+    # Initial load
+    initial_data = pl.DataFrame({
+        "customer_id": [1, 2],
+        "customer_name": ["Alice", "Bob"],
+        "email": ["alice@example.com", "bob@example.com"]
+    })
+    
+    load_bronze_entity(con, "customer", initial_data)
+    process_silver_entity(con, "customer")
+    build_gold_entity(con, "customer")
+    
+    # Update with changes - Alice changes email
+    updated_data = pl.DataFrame({
+        "customer_id": [1, 2],
+        "customer_name": ["Alice", "Bob"],
+        "email": ["alice.new@example.com", "bob@example.com"]  # Alice's email changed
+    })
+    
+    load_bronze_entity(con, "customer", updated_data)
+    process_silver_entity(con, "customer")
+    result = build_gold_entity(con, "customer")
+    
+    # Verify Type 2 behavior
+    gold_data = con.execute("""
+        SELECT customer_id, customer_name, email, _is_current, _valid_to 
+        FROM gold.customer 
+        ORDER BY customer_id, _valid_from
+    """).pl()
+    
+    # Should have 3 records: 2 for Alice (old and new), 1 for Bob
+    assert len(gold_data) == 3
+    
+    # Check Alice's records
+    alice_records = gold_data.filter(pl.col("customer_id") == 1)
+    assert len(alice_records) == 2
+    
+    # Old record should be closed
+    old_alice = alice_records.filter(pl.col("email") == "alice@example.com").row(0, named=True)
+    assert not old_alice["_is_current"]
+    assert old_alice["_valid_to"] is not None
+    
+    # New record should be current
+    new_alice = alice_records.filter(pl.col("email") == "alice.new@example.com").row(0, named=True)
+    assert new_alice["_is_current"]
+    assert new_alice["_valid_to"] is None
+    
+    # Bob should have only one current record
+    bob_records = gold_data.filter(pl.col("customer_id") == 2)
+    assert len(bob_records) == 1
+    assert bob_records.row(0, named=True)["_is_current"]
+
+
+@pytest.mark.parametrize(
+    "reload_data,expected_rows",
+    [
+        # Same rows again: nothing to version
+        ({"customer_id": [1, 2], "customer_name": ["Alice", "Bob"]}, 2),
+        # Customer 3 is added, existing rows unchanged
+        ({"customer_id": [1, 2, 3], "customer_name": ["Alice", "Bob", "Charlie"]}, 3),
+    ],
+    ids=["no_changes", "new_records"],
+)
+def test_type2_dimension_reload_without_changes(isolated_ctl_con, reload_data, expected_rows):
+    """Test that reloading unchanged rows only inserts new keys and keeps all rows current."""
+    con = isolated_ctl_con
+    
+    # Setup entity
+    update_entity_metadata(
+        con,
+        entity_name="customer",
+        entity_type="type2_dimension"
+    )
+    
+    add_entity_columns(con, "customer", [
+        {
+            "column_name": "customer_id", "data_type": "INTEGER",
+            "is_nullable": False, "is_business_key": True,
+        },
+        {
+            "column_name": "customer_name", "data_type": "VARCHAR",
+            "is_nullable": False, "track_history": True,
+        },
+    ])
+    
+    # Initial load
+    initial_data = pl.DataFrame({
+        "customer_id": [1, 2],
+        "customer_name": ["Alice", "Bob"]
+    })
+    
+    load_bronze_entity(con, "customer", initial_data)
+    process_silver_entity(con, "customer")
+    build_gold_entity(con, "customer")
+    
+    # Reload
+    load_bronze_entity(con, "customer", pl.DataFrame(reload_data))
+    process_silver_entity(con, "customer")
+    result = build_gold_entity(con, "customer")
+    
+    assert result["updated_rows"] == 0
+    assert result["new_rows"] == expected_rows - 2
+    
+    # One current, open-ended row per customer
+    assert con.execute(
+        """
+        SELECT list(customer_id ORDER BY customer_id), bool_and(_is_current AND _valid_to IS NULL)
+        FROM gold.customer
+        """
+    ).fetchone() == (reload_data["customer_id"], True)
+
+
+def test_type2_dimension_requires_business_key(isolated_ctl_con):
     """Test that Type 2 dimension requires at least one business key."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.duckdb"
-        con = duckdb.connect(str(db_path))
-        
-        ensure_ctl_tables(con)
-        
-        # Setup entity without business key
-        update_entity_metadata(
-            con,
-            entity_name="customer",
-            entity_type="type2_dimension"
-        )
-        
-        # Add columns but no business key
-        add_entity_column(con, "customer", "customer_name", "VARCHAR", is_nullable=False)
-        add_entity_column(con, "customer", "email", "VARCHAR", is_nullable=False)
-        
-        # Load data
-        data = pl.DataFrame({
-            "customer_name": ["Alice", "Bob"],
-            "email": ["alice@example.com", "bob@example.com"]
-        })
-        
-        load_bronze_entity(con, "customer", data)
-        process_silver_entity(con, "customer")
-        
-        # Should raise error when building Type 2 dimension without business key
-        with pytest.raises(ValueError, match="must have at least one business key"):
-            build_gold_entity(con, "customer")
-        
-        con.close()
+    con = isolated_ctl_con
+    
+    # Setup entity without business key
+    update_entity_metadata(
+        con,
+        entity_name="customer",
+        entity_type="type2_dimension"
+    )
+    
+    # Add columns but no business key
+    add_entity_columns(con, "customer", [
+        {"column_name": "customer_name", "data_type": "VARCHAR", "is_nullable": False},
+        {"column_name": "email", "data_type": "VARCHAR", "is_nullable": False},
+    ])
+    
+    # Load data
+    data = pl.DataFrame({
+        "customer_name": ["Alice", "Bob"],
+        "email": ["alice@example.com", "bob@example.com"]
+    })
+    
+    load_bronze_entity(con, "customer", data)
+    process_silver_entity(con, "customer")
+    
+    # Should raise error when building Type 2 dimension without business key
+    with pytest.raises(ValueError, match="must have at least one business key"):
+        build_gold_entity(con, "customer")
 
 
-def test_type2_dimension_composite_business_key():
+def test_type2_dimension_composite_business_key(isolated_ctl_con):
     """Test Type 2 dimension with composite business key."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.duckdb"
-        con = duckdb.connect(str(db_path))
-        
-        ensure_ctl_tables(con)
-        
-        # Setup entity with composite business key
-        update_entity_metadata(
-            con,
-            entity_name="product",
-            entity_type="type2_dimension"
-        )
-        
-        # Multiple business keys
-        add_entity_column(con, "product", "product_code", "VARCHAR", is_nullable=False, is_business_key=True)
-        add_entity_column(con, "product", "vendor_id", "INTEGER", is_nullable=False, is_business_key=True)
-        add_entity_column(con, "product", "product_name", "VARCHAR", is_nullable=False, track_history=True)
-        add_entity_column(con, "product", "price", "DECIMAL(10,2)", is_nullable=False, track_history=True)
-        
-        # Initial load
-        initial_data = pl.DataFrame({
-            "product_code": ["P001", "P002"],
-            "vendor_id": [1, 1],
-            "product_name": ["Widget A", "Widget B"],
-            "price": [10.99, 15.99]
-        })
-        
-        load_bronze_entity(con, "product", initial_data)
-        process_silver_entity(con, "product")
-        build_gold_entity(con, "product")
-        
-        # Update price for P001 from vendor 1
-        updated_data = pl.DataFrame({
-            "product_code": ["P001", "P002"],
-            "vendor_id": [1, 1],
-            "product_name": ["Widget A", "Widget B"],
-            "price": [12.99, 15.99]  # P001 price changed
-        })
-        
-        load_bronze_entity(con, "product", updated_data)
-        process_silver_entity(con, "product")
-        result = build_gold_entity(con, "product")
-        
-        # Should have 3 records: 2 for P001, 1 for P002
-        gold_data = con.execute("SELECT * FROM gold.product").fetchdf()
-        assert len(gold_data) == 3
-        
-        # Check P001 has 2 versions
-        p001_records = gold_data[
-            (gold_data["product_code"] == "P001") & (gold_data["vendor_id"] == 1)
-        ]
-        assert len(p001_records) == 2
-        
-        con.close()
-
-
-def test_entity_type_metadata():
+    con = isolated_ctl_con
+    
+    # Setup entity with composite business key
+    update_entity_metadata(
+        con,
+        entity_name="product",
+        entity_type="type2_dimension"
+    )
+    
+    # Multiple business keys
+    add_entity_columns(con, "product", [
+        {
+            "column_name": "product_code", "data_type": "VARCHAR",
+            "is_nullable": False, "is_business_key": True,
+        },
+        {
+            "column_name": "vendor_id", "data_type": "INTEGER",
+            "is_nullable": False, "is_business_key": True,
+        },
+        {
+            "column_name": "product_name", "data_type": "VARCHAR",
+            "is_nullable": False, "track_history": True,
+        },
+        {
+            "column_name": "price", "data_type": "DECIMAL(10,2)",
+            "is_nullable": False, "track_history": True,
+        },
+    ])
+    
+    # Initial load
+    initial_data = pl.DataFrame({
+        "product_code": ["P001", "P002"],
+        "vendor_id": [1, 1],
+        "product_name": ["Widget A", "Widget B"],
+        "price": [10.99, 15.99]
+    })
+    
+    load_bronze_entity(con, "product", initial_data)
+    process_silver_entity(con, "product")
+    build_gold_entity(con, "product")
+    
+    # Update price for P001 from vendor 1
+    updated_data = pl.DataFrame({
+        "product_code": ["P001", "P002"],
+        "vendor_id": [1, 1],
+        "product_name": ["Widget A", "Widget B"],
+        "price": [12.99, 15.99]  # P001 price changed
+    })
+    
+    load_bronze_entity(con, "product", updated_data)
+    process_silver_entity(con, "product")
+    result = build_gold_entity(con, "product")
+    
+    # Should have 3 records: 2 for P001, 1 for P002
+    gold_data = con.execute("SELECT * FROM gold.product").pl()
+    assert len(gold_data) == 3
+    
+    # Check P001 has 2 versions
+    p001_records = gold_data.filter(
+        (pl.col("product_code") == "P001") & (pl.col("vendor_id") == 1)
+    )
+    assert len(p001_records) == 2
+
+
+def test_entity_type_metadata(isolated_ctl_con):
     """Test that entity_type is properly stored and retrieved."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.duckdb"
-        con = duckdb.connect(str(db_path))
-        
-        ensure_ctl_tables(con)
-        
-        # Create different entity types
-        update_entity_metadata(con, "fact_sales", entity_type="fact")
-        update_entity_metadata(con, "dim_customer", entity_type="dimension")
-        update_entity_metadata(con, "dim_product", entity_type="type2_dimension")
-        
-        # Verify entity types are stored
-        result = con.execute("""
-            SELECT entity_name, entity_type 
-            FROM entity_metadata 
-            ORDER BY entity_name
-        """).fetchall()
-        
-        assert len(result) == 3
-        entity_types = {name: etype for name, etype in result}
-        
-        assert entity_types["fact_sales"] == "fact"
-        assert entity_types["dim_customer"] == "dimension"
-        assert entity_types["dim_product"] == "type2_dimension"
-        
-        con.close()
-
-
-def test_column_metadata_with_business_key_and_track_history():
+    con = isolated_ctl_con
+    
+    # Create different entity types
+    update_entity_metadata(con, "fact_sales", entity_type="fact")
+    update_entity_metadata(con, "dim_customer", entity_type="dimension")
+    update_entity_metadata(con, "dim_product", entity_type="type2_dimension")
+    
+    # Verify entity types are stored
+    result = con.execute("""
+        SELECT entity_name, entity_type 
+        FROM entity_metadata 
+        ORDER BY entity_name
+    """).fetchall()
+    
+    assert len(result) == 3
+    entity_types = {name: etype for name, etype in result}
+    
+    assert entity_types["fact_sales"] == "fact"
+    assert entity_types["dim_customer"] == "dimension"
+    assert entity_types["dim_product"] == "type2_dimension"
+
+
+def test_column_metadata_with_business_key_and_track_history(isolated_ctl_con):
     """Test that column metadata properly stores business key and track_history flags."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        db_path = Path(tmpdir) / "test.duckdb"
-        con = duckdb.connect(str(db_path))
-        
-        ensure_ctl_tables(con)
-        
-        update_entity_metadata(con, "customer", entity_type="type2_dimension")
-        
-        # Add columns with different flags
-        add_entity_column(con, "customer", "customer_id", "INTEGER", 
-                         is_nullable=False, is_business_key=True)
-        add_entity_column(con, "customer", "customer_name", "VARCHAR", 
-                         is_nullable=False, track_history=True)
-        add_entity_column(con, "customer", "created_date", "DATE", 
-                         is_nullable=False, track_history=False)
-        
-        # Verify column metadata
-        result = con.execute("""
-            SELECT column_name, is_business_key, track_history
-            FROM entity_column_metadata ecm
-            JOIN entity_metadata em ON ecm.entity_id = em.entity_id
-            WHERE em.entity_name = 'customer'
-            ORDER BY column_name
-        """).fetchall()
-        
-        assert len(result) == 3
-        
-        # Convert to dict for easier testing
-        col_meta = {name: {"is_business_key": bk, "track_history": th} 
-                    for name, bk, th in result}
-        
-        assert col_meta["customer_id"]["is_business_key"] is True
-        assert col_meta["customer_id"]["track_history"] is False
-        
-        assert col_meta["customer_name"]["is_business_key"] is False
-        assert col_meta["customer_name"]["track_history"] is True
-        
-        assert col_meta["created_date"]["is_business_key"] is False
-        assert col_meta["created_date"]["track_history"] is False
-        
-        con.close()
+    con = isolated_ctl_con
+    
+    update_entity_metadata(con, "customer", entity_type="type2_dimension")
+    
+    # Add columns with different flags
+    add_entity_columns(con, "customer", [
+        {
+            "column_name": "customer_id", "data_type": "INTEGER",
+            "is_nullable": False, "is_business_key": True,
+        },
+        {
+            "column_name": "customer_name", "data_type": "VARCHAR",
+            "is_nullable": False, "track_history": True,
+        },
+        {
+            "column_name": "created_date", "data_type": "DATE",
+            "is_nullable": False, "track_history": False,
+        },
+    ])
+    
+    # Verify column metadata
+    result = con.execute("""
+        SELECT column_name, is_business_key, track_history
+        FROM entity_column_metadata ecm
+        JOIN entity_metadata em ON ecm.entity_id = em.entity_id
+        WHERE em.entity_name = 'customer'
+        ORDER BY column_name
+    """).fetchall()
+    
+    assert len(result) == 3
+    
+    # Convert to dict for easier testing
+    col_meta = {name: {"is_business_key": bk, "track_history": th} 
+                for name, bk, th in result}
+    
+    assert col_meta["customer_id"]["is_business_key"] is True
+    assert col_meta["customer_id"]["track_history"] is False
+    
+    assert col_meta["customer_name"]["is_business_key"] is False
+    assert col_meta["customer_name"]["track_history"] is True
+    
+    assert col_meta["created_date"]["is_business_key"] is False
+    assert col_meta["created_date"]["track_history"] is False
+
+
+def test_bronze_row_hash_ignores_metadata_columns(isolated_ctl_con):
+    """Test that reloading a bronze frame keeps the same row hashes."""
+    con = isolated_ctl_con
+    source = pl.DataFrame({"customer_id": [1, 2], "name": ["Alice", "Bob"]})
+
+    first = load_bronze_entity(con, "customer", source)
+    reloaded = load_bronze_entity(con, "customer", first)
+
+    assert reloaded.columns == ["customer_id", "name", "_load_date", "_row_hash"]
+    assert reloaded["_row_hash"].to_list() == first["_row_hash"].to_list()
+    assert con.execute(
+        "SELECT data_type FROM information_schema.columns "
+        "WHERE table_name = 'customer_bronze' AND column_name = '_row_hash'"
+    ).fetchone() == ("UBIGINT",)
+
+
+def test_bronze_row_hash_distinguishes_nulls(isolated_ctl_con):
+    """Test that rows differing only in which column is null get different hashes."""
+    con = isolated_ctl_con
+    source = pl.DataFrame({"customer_id": [1, None], "name": [None, "1"]})
+
+    df = load_bronze_entity(con, "customer", source)
+
+    assert df["_row_hash"].null_count() == 0
+    assert df["_row_hash"].n_unique() == 2
+
+
+def test_type2_dimension_incremental_counts(isolated_ctl_con):
+    """Test that an incremental Type 2 build reports changed and new rows separately."""
+    con = isolated_ctl_con
+    update_entity_metadata(con, entity_name="customer", entity_type="type2_dimension")
+    add_entity_columns(con, "customer", [
+        {
+            "column_name": "customer_id", "data_type": "INTEGER",
+            "is_nullable": False, "is_business_key": True,
+        },
+        {
+            "column_name": "customer_name", "data_type": "VARCHAR",
+            "track_history": True,
+        },
+    ])
+
+    load_bronze_entity(con, "customer", pl.DataFrame({
+        "customer_id": [1, 2, 3],
+        "customer_name": ["Alice", "Bob", "Carol"],
+    }))
+    process_silver_entity(con, "customer")
+    build_gold_entity(con, "customer")
+
+    # Bob and Carol change, Alice is unchanged and Dave is new
+    load_bronze_entity(con, "customer", pl.DataFrame({
+        "customer_id": [1, 2, 3, 4],
+        "customer_name": ["Alice", "Robert", "Caroline", "Dave"],
+    }))
+    process_silver_entity(con, "customer")
+    result = build_gold_entity(con, "customer")
+
+    assert result["updated_rows"] == 2
+    assert result["changed_rows"] == 2
+    assert result["new_rows"] == 1
+    assert result["total_rows"] == 6
+
+    current = con.execute("""
+        SELECT customer_id, customer_name FROM gold.customer
+        WHERE _is_current ORDER BY customer_id
+    """).fetchall()
+    assert current == [(1, "Alice"), (2, "Robert"), (3, "Caroline"), (4, "Dave")]
+
+
+def test_type2_dimension_reload_only_draws_keys_for_inserted_rows(isolated_ctl_con):
+    """Test that unchanged reloads don't consume surrogate keys."""
+    con = isolated_ctl_con
+    update_entity_metadata(con, entity_name="customer", entity_type="type2_dimension")
+    add_entity_columns(con, "customer", [
+        {"column_name": "customer_id", "data_type": "INTEGER", "is_business_key": True},
+        {"column_name": "customer_name", "data_type": "VARCHAR", "track_history": True},
+    ])
+    data = pl.DataFrame({"customer_id": [1, 2, 3], "customer_name": ["Alice", "Bob", "Carol"]})
+
+    # Initial load plus two no-op reloads
+    for _ in range(3):
+        load_bronze_entity(con, "customer", data)
+        process_silver_entity(con, "customer")
+        build_gold_entity(con, "customer")
+
+    load_bronze_entity(con, "customer", data.vstack(
+        pl.DataFrame({"customer_id": [4], "customer_name": ["Dave"]})
+    ))
+    process_silver_entity(con, "customer")
+    build_gold_entity(con, "customer")
+
+    assert con.execute(
+        "SELECT customer_key FROM gold.customer WHERE customer_id = 4"
+    ).fetchone() == (4,)
+
+
+def test_bronze_load_keeps_source_row_order():
+    """Test that the returned frame keeps source order without insertion-order preservation."""
+    con = connect(
+        "duckdb://:memory:", config={"preserve_insertion_order": False, "threads": 4}
+    )
+    # Large enough for DuckDB to scan the frame in parallel
+    source = pl.DataFrame({"id": range(300_000)}).with_columns(
+        pl.col("id").cast(pl.String).alias("name")
+    )
+
+    df = load_bronze_entity(con, "customer", source)
+
+    assert df["id"].to_list() == source["id"].to_list()
+    stored = con.execute(
+        "SELECT id, _row_hash FROM bronze.customer_bronze WHERE id IN (0, 299999) ORDER BY id"
+    ).fetchall()
+    assert stored == [(0, df["_row_hash"][0]), (299_999, df["_row_hash"][-1])]
+    con.close()
+
+
+def test_bronze_row_hash_is_stable(isolated_ctl_con):
+    """Test that _row_hash is the first 64 bits of the MD5 of the row's JSON text."""
+    con = isolated_ctl_con
+    source = pl.DataFrame({"customer_id": [1], "name": ['a"b|c'], "score": [None]})
+
+    df = load_bronze_entity(con, "customer", source)
+
+    digest = hashlib.md5(b'["1","a\\"b|c",null]').hexdigest()
+    assert df["_row_hash"].to_list() == [int(digest[:16], 16)]
+
+
+def test_type2_dimension_migrates_varchar_row_hash(isolated_ctl_con):
+    """Test that a dimension with hex VARCHAR row hashes keeps working."""
+    con = isolated_ctl_con
+    update_entity_metadata(con, entity_name="customer", entity_type="type2_dimension")
+    add_entity_columns(con, "customer", [
+        {"column_name": "customer_id", "data_type": "INTEGER", "is_business_key": True},
+        {"column_name": "customer_name", "data_type": "VARCHAR", "track_history": True},
+    ])
+    load_bronze_entity(con, "customer", pl.DataFrame({
+        "customer_id": [1, 2], "customer_name": ["Alice", "Bob"],
+    }))
+    process_silver_entity(con, "customer")
+    build_gold_entity(con, "customer")
+
+    # Dimensions built by earlier releases store _row_hash as the SHA-256 hex
+    # digest of the source values joined with '|'
+    con.execute("ALTER TABLE gold.customer ALTER COLUMN _row_hash SET DATA TYPE VARCHAR")
+    con.executemany(
+        "UPDATE gold.customer SET _row_hash = ? WHERE customer_id = ?",
+        [
+            [hashlib.sha256(f"{customer_id}|{name}".encode()).hexdigest(), customer_id]
+            for customer_id, name in [(1, "Alice"), (2, "Bob")]
+        ],
+    )
+    assert len(con.execute("SELECT _row_hash FROM gold.customer").fetchone()[0]) == 64
+
+    load_bronze_entity(con, "customer", pl.DataFrame({
+        "customer_id": [1, 2], "customer_name": ["Alice", "Robert"],
+    }))
+    process_silver_entity(con, "customer")
+    result = build_gold_entity(con, "customer")
+
+    assert result["updated_rows"] == 1
+    assert result["new_rows"] == 0
+    assert result["total_rows"] == 3
+    assert con.execute(
+        "SELECT customer_name FROM gold.customer WHERE _is_current ORDER BY customer_id"
+    ).fetchall() == [("Alice",), ("Robert",)]
+    assert con.execute(
+        "SELECT data_type FROM information_schema.columns "
+        "WHERE table_name = 'customer' AND column_name = '_row_hash'"
+    ).fetchone() == ("UBIGINT",)
+
+
+def test_type2_dimension_initial_keys_follow_business_key(isolated_ctl_con):
+    """Test that the initial load numbers surrogate keys in business key order."""
+    con = isolated_ctl_con
+    update_entity_metadata(con, entity_name="customer", entity_type="type2_dimension")
+    add_entity_columns(con, "customer", [
+        {"column_name": "customer_id", "data_type": "INTEGER", "is_business_key": True},
+        {"column_name": "customer_name", "data_type": "VARCHAR", "track_history": True},
+    ])
+    load_bronze_entity(con, "customer", pl.DataFrame({
+        "customer_id": [3, 1, 2], "customer_name": ["Carol", "Alice", "Bob"],
+    }))
+    process_silver_entity(con, "customer")
+    build_gold_entity(con, "customer")
+
+    assert con.execute(
+        "SELECT customer_id, customer_key FROM gold.customer ORDER BY customer_id"
+    ).fetchall() == [(1, 1), (2, 2), (3, 3)]